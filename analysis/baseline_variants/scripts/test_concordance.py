@@ -1,8 +1,15 @@
-from unittest.mock import patch
+from types import SimpleNamespace
 
 import pandas as pd
 from concordance import *
-from pytest import raises, approx, fixture
+from pytest import raises, approx, fixture, mark, param
+
+
+def make_variant(**kwargs) -> SimpleNamespace:
+    """A lightweight stand-in for a cyvcf2.Variant"""
+    attributes = dict(CHROM="chr1", POS=0, genotypes=[[-1]], FILTER=None, ALT=[])
+    attributes.update(kwargs)
+    return SimpleNamespace(**attributes)
 
 
 @fixture
@@ -45,293 +52,172 @@ def dataset() -> pd.DataFrame:
 
 
 class TestClassification:
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_variantIsNull(self, mocked_variant):
-        mocked_variant.genotypes = [[-1]]
+    def test_variantIsNull(self):
+        variant = make_variant(genotypes=[[-1]])
 
-        actual = Classification.from_variant(mocked_variant)
+        actual = Classification.from_variant(variant)
         expected = Classification.Null
 
         assert actual == expected
 
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_variantIsHomRef(self, mocked_variant):
-        mocked_variant.genotypes = [[0, 0]]
+    def test_variantIsHomRef(self):
+        variant = make_variant(genotypes=[[0, 0]])
 
-        actual = Classification.from_variant(mocked_variant)
+        actual = Classification.from_variant(variant)
         expected = Classification.Ref
 
         assert actual == expected
 
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_variantIsHet(self, mocked_variant):
-        mocked_variant.genotypes = [[1, 0]]
+    def test_variantIsHet(self):
+        variant = make_variant(genotypes=[[1, 0]])
 
-        actual = Classification.from_variant(mocked_variant)
+        actual = Classification.from_variant(variant)
         expected = Classification.Het
 
         assert actual == expected
 
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_variantIsHomAlt(self, mocked_variant):
-        mocked_variant.genotypes = [[1, 1]]
+    def test_variantIsHomAlt(self):
+        variant = make_variant(genotypes=[[1, 1]])
 
-        actual = Classification.from_variant(mocked_variant)
+        actual = Classification.from_variant(variant)
         expected = Classification.Alt
 
         assert actual == expected
 
 
 class TestClassify:
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_positionsDontMatch_raisesError(self, mocked_avariant, mocked_bvariant):
+    def test_positionsDontMatch_raisesError(self):
         classifier = Classifier()
-        mocked_avariant.POS = 1
-        mocked_bvariant.POS = 2
+        a_variant = make_variant(POS=1)
+        b_variant = make_variant(POS=2)
 
         with raises(IndexError):
-            classifier.classify(mocked_avariant, mocked_bvariant)
+            classifier.classify(a_variant, b_variant)
 
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_positionInMask_returnsMasked(self, mocked_avariant, mocked_bvariant):
+    def test_positionInMask_returnsMasked(self):
         mask = Bed()
         pos = 2
         chrom = "chr1"
         mask.positions = {chrom: {pos - 1}}
         classifier = Classifier(mask=mask)
-        mocked_avariant.POS = pos
-        mocked_avariant.CHROM = chrom
-        mocked_avariant.genotypes = [[-1]]
-        mocked_bvariant.POS = pos
-        mocked_bvariant.genotypes = [[0]]
+        a_variant = make_variant(POS=pos, CHROM=chrom, genotypes=[[-1]])
+        b_variant = make_variant(POS=pos, genotypes=[[0]])
 
-        actual = classifier.classify(mocked_avariant, mocked_bvariant)
+        actual = classifier.classify(a_variant, b_variant)
         expected = Classification.Null, Classification.Ref, Outcome.Masked
 
         assert actual == expected
 
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_aHasNull_returnsNull(self, mocked_avariant, mocked_bvariant):
-        pos = 2
-        classifier = Classifier()
-        mocked_avariant.POS = pos
-        mocked_avariant.genotypes = [[-1]]
-        mocked_bvariant.POS = pos
-        mocked_bvariant.genotypes = [[0]]
-
-        actual = classifier.classify(mocked_avariant, mocked_bvariant)
-        expected = Classification.Null, Classification.Ref, Outcome.Null
-
-        assert actual == expected
-
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_bothHaveNull_returnsNull(self, mocked_avariant, mocked_bvariant):
-        pos = 2
-        classifier = Classifier()
-        mocked_avariant.POS = pos
-        mocked_avariant.genotypes = [[-1, -1]]
-        mocked_bvariant.POS = pos
-        mocked_bvariant.genotypes = [[-1]]
-
-        actual = classifier.classify(mocked_avariant, mocked_bvariant)
-        expected = Classification.Null, Classification.Null, Outcome.Null
-
-        assert actual == expected
-
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_bHasNullOnly_returnsFalseNull(self, mocked_avariant, mocked_bvariant):
-        pos = 2
-        classifier = Classifier()
-        mocked_avariant.POS = pos
-        mocked_avariant.genotypes = [[1, -1]]
-        mocked_bvariant.POS = pos
-        mocked_bvariant.genotypes = [[-1]]
-
-        actual = classifier.classify(mocked_avariant, mocked_bvariant)
-        expected = Classification.Alt, Classification.Null, Outcome.FalseNull
-
-        assert actual == expected
-
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_bothRef_returnsTrueRef(self, mocked_avariant, mocked_bvariant):
-        pos = 2
-        classifier = Classifier()
-        mocked_avariant.POS = pos
-        mocked_avariant.genotypes = [[0, -1]]
-        mocked_bvariant.POS = pos
-        mocked_bvariant.genotypes = [[0, False]]
-
-        actual = classifier.classify(mocked_avariant, mocked_bvariant)
-        expected = Classification.Ref, Classification.Ref, Outcome.TrueRef
-
-        assert actual == expected
-
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_bIsRef_returnsFalseRef(self, mocked_avariant, mocked_bvariant):
-        pos = 2
-        classifier = Classifier()
-        mocked_avariant.POS = pos
-        mocked_avariant.genotypes = [[1, -1]]
-        mocked_avariant.ALT = ["C"]
-        mocked_bvariant.POS = pos
-        mocked_bvariant.genotypes = [[0, False]]
-
-        actual = classifier.classify(mocked_avariant, mocked_bvariant)
-        expected = Classification.Alt, Classification.Ref, Outcome.FalseRef
-
-        assert actual == expected
-
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_aIsRefBIsAlt_returnsFalseAlt(self, mocked_avariant, mocked_bvariant):
-        pos = 2
-        classifier = Classifier()
-        mocked_avariant.POS = pos
-        mocked_avariant.genotypes = [[0, 0]]
-        mocked_bvariant.POS = pos
-        mocked_bvariant.genotypes = [[3]]
-
-        actual = classifier.classify(mocked_avariant, mocked_bvariant)
-        expected = Classification.Ref, Classification.Alt, Outcome.FalseAlt
-
-        assert actual == expected
-
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_bothAlt_returnsTrueAlt(self, mocked_avariant, mocked_bvariant):
-        pos = 2
-        classifier = Classifier()
-        mocked_avariant.POS = pos
-        mocked_avariant.genotypes = [[1, 1]]
-        mocked_avariant.ALT = ["C"]
-        mocked_bvariant.POS = pos
-        mocked_bvariant.genotypes = [[1]]
-        mocked_bvariant.ALT = ["C"]
-
-        actual = classifier.classify(mocked_avariant, mocked_bvariant)
-        expected = Classification.Alt, Classification.Alt, Outcome.TrueAlt
-
-        assert actual == expected
-
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_bothAltButDifferent_returnsDiffAlt(self, mocked_avariant, mocked_bvariant):
-        pos = 2
-        classifier = Classifier()
-        mocked_avariant.POS = pos
-        mocked_avariant.genotypes = [[1, 1]]
-        mocked_avariant.ALT = ["C"]
-        mocked_bvariant.POS = pos
-        mocked_bvariant.genotypes = [[1]]
-        mocked_bvariant.ALT = ["A"]
-
-        actual = classifier.classify(mocked_avariant, mocked_bvariant)
-        expected = Classification.Alt, Classification.Alt, Outcome.DiffAlt
-
-        assert actual == expected
-
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_bothFailFilter_returnsBothFailFilter(
-        self, mocked_avariant, mocked_bvariant
-    ):
-        pos = 2
-        classifier = Classifier(apply_filter=True)
-        mocked_avariant.POS = pos
-        mocked_avariant.FILTER = "b1"
-        mocked_avariant.genotypes = [[0, 0]]
-        mocked_bvariant.POS = pos
-        mocked_bvariant.FILTER = "f0.90;z"
-        mocked_bvariant.genotypes = [[0]]
-
-        actual = classifier.classify(mocked_avariant, mocked_bvariant)
-        expected = Classification.Ref, Classification.Ref, Outcome.BothFailFilter
-
-        assert actual == expected
-
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_aFailFilter_returnsAFailFilter(self, mocked_avariant, mocked_bvariant):
+    @mark.parametrize(
+        "a_fields,b_fields,apply_filter,expected",
+        [
+            param(
+                dict(genotypes=[[-1]]),
+                dict(genotypes=[[0]]),
+                False,
+                (Classification.Null, Classification.Ref, Outcome.Null),
+                id="aHasNull_returnsNull",
+            ),
+            param(
+                dict(genotypes=[[-1, -1]]),
+                dict(genotypes=[[-1]]),
+                False,
+                (Classification.Null, Classification.Null, Outcome.Null),
+                id="bothHaveNull_returnsNull",
+            ),
+            param(
+                dict(genotypes=[[1, -1]]),
+                dict(genotypes=[[-1]]),
+                False,
+                (Classification.Alt, Classification.Null, Outcome.FalseNull),
+                id="bHasNullOnly_returnsFalseNull",
+            ),
+            param(
+                dict(genotypes=[[0, -1]]),
+                dict(genotypes=[[0, False]]),
+                False,
+                (Classification.Ref, Classification.Ref, Outcome.TrueRef),
+                id="bothRef_returnsTrueRef",
+            ),
+            param(
+                dict(genotypes=[[1, -1]], ALT=["C"]),
+                dict(genotypes=[[0, False]]),
+                False,
+                (Classification.Alt, Classification.Ref, Outcome.FalseRef),
+                id="bIsRef_returnsFalseRef",
+            ),
+            param(
+                dict(genotypes=[[0, 0]]),
+                dict(genotypes=[[3]]),
+                False,
+                (Classification.Ref, Classification.Alt, Outcome.FalseAlt),
+                id="aIsRefBIsAlt_returnsFalseAlt",
+            ),
+            param(
+                dict(genotypes=[[1, 1]], ALT=["C"]),
+                dict(genotypes=[[1]], ALT=["C"]),
+                False,
+                (Classification.Alt, Classification.Alt, Outcome.TrueAlt),
+                id="bothAlt_returnsTrueAlt",
+            ),
+            param(
+                dict(genotypes=[[1, 1]], ALT=["C"]),
+                dict(genotypes=[[1]], ALT=["A"]),
+                False,
+                (Classification.Alt, Classification.Alt, Outcome.DiffAlt),
+                id="bothAltButDifferent_returnsDiffAlt",
+            ),
+            param(
+                dict(FILTER="b1", genotypes=[[0, 0]]),
+                dict(FILTER="f0.90;z", genotypes=[[0]]),
+                True,
+                (Classification.Ref, Classification.Ref, Outcome.BothFailFilter),
+                id="bothFailFilter_returnsBothFailFilter",
+            ),
+            param(
+                dict(FILTER="b1", genotypes=[[0, 0]]),
+                dict(FILTER=None, genotypes=[[0, 0]]),
+                True,
+                (Classification.Ref, Classification.Ref, Outcome.AFailFilter),
+                id="aFailFilter_returnsAFailFilter",
+            ),
+            param(
+                dict(FILTER=None, genotypes=[[0, 0]]),
+                dict(FILTER="foo;bar", genotypes=[[0, 0]]),
+                True,
+                (Classification.Ref, Classification.Ref, Outcome.BFailFilter),
+                id="bFailFilter_returnsBFailFilter",
+            ),
+            param(
+                dict(genotypes=[[0, 1]]),
+                dict(genotypes=[[0, 1]]),
+                False,
+                (Classification.Het, Classification.Het, Outcome.Het),
+                id="bothHet_returnsBothHet",
+            ),
+            param(
+                dict(genotypes=[[0, 1]]),
+                dict(genotypes=[[0]]),
+                False,
+                (Classification.Het, Classification.Ref, Outcome.Het),
+                id="aIsHet_returnsAHet",
+            ),
+            param(
+                dict(genotypes=[[0, 0]]),
+                dict(genotypes=[[0, 1]]),
+                False,
+                (Classification.Ref, Classification.Het, Outcome.Het),
+                id="bIsHet_returnsBHet",
+            ),
+        ],
+    )
+    def test_classify(self, a_fields, b_fields, apply_filter, expected):
         pos = 2
-        classifier = Classifier(apply_filter=True)
-        mocked_avariant.POS = pos
-        mocked_avariant.FILTER = "b1"
-        mocked_avariant.genotypes = [[0, 0]]
-        mocked_bvariant.POS = pos
-        mocked_bvariant.FILTER = None
-        mocked_bvariant.genotypes = [[0, 0]]
-
-        actual = classifier.classify(mocked_avariant, mocked_bvariant)
-        expected = Classification.Ref, Classification.Ref, Outcome.AFailFilter
-
-        assert actual == expected
-
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_bFailFilter_returnsBFailFilter(self, mocked_avariant, mocked_bvariant):
-        pos = 2
-        classifier = Classifier(apply_filter=True)
-        mocked_avariant.POS = pos
-        mocked_avariant.FILTER = None
-        mocked_avariant.genotypes = [[0, 0]]
-        mocked_bvariant.POS = pos
-        mocked_bvariant.FILTER = "foo;bar"
-        mocked_bvariant.genotypes = [[0, 0]]
-
-        actual = classifier.classify(mocked_avariant, mocked_bvariant)
-        expected = Classification.Ref, Classification.Ref, Outcome.BFailFilter
-
-        assert actual == expected
-
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_bothHet_returnsBothHet(self, mocked_avariant, mocked_bvariant):
-        pos = 2
-        classifier = Classifier()
-        mocked_avariant.POS = pos
-        mocked_avariant.genotypes = [[0, 1]]
-        mocked_bvariant.POS = pos
-        mocked_bvariant.genotypes = [[0, 1]]
-
-        actual = classifier.classify(mocked_avariant, mocked_bvariant)
-        expected = Classification.Het, Classification.Het, Outcome.Het
-
-        assert actual == expected
-
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_aIsHet_returnsAHet(self, mocked_avariant, mocked_bvariant):
-        pos = 2
-        classifier = Classifier()
-        mocked_avariant.POS = pos
-        mocked_avariant.genotypes = [[0, 1]]
-        mocked_bvariant.POS = pos
-        mocked_bvariant.genotypes = [[0]]
-
-        actual = classifier.classify(mocked_avariant, mocked_bvariant)
-        expected = Classification.Het, Classification.Ref, Outcome.Het
-
-        assert actual == expected
-
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_bIsHet_returnsBHet(self, mocked_avariant, mocked_bvariant):
-        pos = 2
-        classifier = Classifier()
-        mocked_avariant.POS = pos
-        mocked_avariant.genotypes = [[0, 0]]
-        mocked_bvariant.POS = pos
-        mocked_bvariant.genotypes = [[0, 1]]
+        classifier = Classifier(apply_filter=apply_filter)
+        a_variant = make_variant(POS=pos, **a_fields)
+        b_variant = make_variant(POS=pos, **b_fields)
 
-        actual = classifier.classify(mocked_avariant, mocked_bvariant)
-        expected = Classification.Ref, Classification.Het, Outcome.Het
+        actual = classifier.classify(a_variant, b_variant)
 
         assert actual == expected
 
@@ -1,130 +1,61 @@
+import gzip
 import logging
-from collections import Counter
-from dataclasses import dataclass
-from enum import Enum
-from typing import Optional, NamedTuple, List, Tuple
+from array import array
+from concurrent.futures import Executor, ThreadPoolExecutor
+from itertools import islice
+from typing import Optional, List, Tuple, Iterable, Iterator, BinaryIO, TypeVar
 
 import click
+import numpy as np
 from cyvcf2 import Variant, VCF, Writer
 
+CHUNK_SIZE = 10_000
+FILTER_COL = 6
+T = TypeVar("T")
+
+
+# FORMAT tags read from pandora's VCF
+FWD_COVG = "MEAN_FWD_COVG"
+REV_COVG = "MEAN_REV_COVG"
+GAPS = "GAPS"
+GT_CONF = "GT_CONF"
+# IDs of the filters applied
+LOW_COVG = "ld"
+HIGH_COVG = "hd"
+STRAND_BIAS = "sb"
+HIGH_GAPS = "hg"
+LOW_GT_CONF = "lgc"
+PASS = "PASS"
+PASS_BYTES = PASS.encode("ascii")
+MISSING_BYTES = b"."
+
+
+# bits of the mask holding the filter status of a variant
+LOW_COVG_BIT = 1 << 0
+HIGH_COVG_BIT = 1 << 1
+LOW_GT_CONF_BIT = 1 << 2
+STRAND_BIAS_BIT = 1 << 3
+HIGH_GAPS_BIT = 1 << 4
+NUM_FILTER_MASKS = 1 << 5
+# smallest positive float, used to keep a denominator away from 0
+TINY = np.finfo(np.float64).tiny
+# the order filters are listed in the FILTER field
+FILTER_BITS: Tuple[Tuple[int, str], ...] = (
+    (LOW_COVG_BIT, LOW_COVG),
+    (HIGH_COVG_BIT, HIGH_COVG),
+    (LOW_GT_CONF_BIT, LOW_GT_CONF),
+    (STRAND_BIAS_BIT, STRAND_BIAS),
+    (HIGH_GAPS_BIT, HIGH_GAPS),
+)
 
-class Tags(Enum):
-    FwdCovg = "MEAN_FWD_COVG"
-    RevCovg = "MEAN_REV_COVG"
-    LowCovg = "ld"
-    HighCovg = "hd"
-    StrandBias = "sb"
-    Gaps = "GAPS"
-    HighGaps = "hg"
-    GtypeConf = "GT_CONF"
-    LowGtConf = "lgc"
-    Pass = "PASS"
-
-    def __str__(self) -> str:
-        return str(self.value)
-
-
-class Genotype(NamedTuple):
-    allele1: int
-    allele2: int
-
-    def is_null(self) -> bool:
-        """Is the genotype null. i.e. ./."""
-        return self.allele1 == -1 and self.allele2 == -1
-
-    def is_hom(self) -> bool:
-        """Is the genotype homozygous"""
-        if self.is_null():
-            return False
-        if self.allele1 == -1 or self.allele2 == -1:
-            return True
-        return self.allele1 == self.allele2
-
-    def is_het(self) -> bool:
-        """Is the genotype heterozyhous"""
-        return not self.is_null() and not self.is_hom()
-
-    def is_hom_ref(self) -> bool:
-        """Is genotype homozygous reference?"""
-        return self.is_hom() and (self.allele1 == 0 or self.allele2 == 0)
-
-    def is_hom_alt(self) -> bool:
-        """Is genotype homozygous alternate?"""
-        return self.is_hom() and (self.allele1 > 0 or self.allele2 > 0)
-
-    def alt_index(self) -> Optional[int]:
-        """If the genotype is homozygous alternate, returns the 0-based index of the
-        alt allele in the alternate allele array.
-        """
-        if not self.is_hom_alt():
-            return None
-        return max(self.allele1, self.allele2) - 1
-
-    def allele_index(self) -> Optional[int]:
-        """The index of the called allele"""
-        if self.is_hom_ref() or self.is_null():
-            return 0
-        elif self.is_hom_alt():
-            return self.alt_index() + 1
-        else:
-            raise NotImplementedError(f"Het Genotype is unexpected: {self}")
-
-    @staticmethod
-    def from_arr(arr: List[int]) -> "Genotype":
-        alleles = [a for a in arr if type(a) is int]
-        if len(alleles) < 2:
-            alleles.append(-1)
-        return Genotype(*alleles)
-
-
-@dataclass
-class FilterStatus:
-    low_covg: bool = False
-    high_covg: bool = False
-    strand_bias: bool = False
-    low_gt_conf: bool = False
-    high_gaps: bool = False
-    delim: str = ";"
-
-    def __str__(self) -> str:
-        status = []
-        if self.low_covg:
-            status.append(str(Tags.LowCovg))
-        if self.high_covg:
-            status.append(str(Tags.HighCovg))
-        if self.low_gt_conf:
-            status.append(str(Tags.LowGtConf))
-        if self.strand_bias:
-            status.append(str(Tags.StrandBias))
-        if self.high_gaps:
-            status.append(str(Tags.HighGaps))
-
-        return self.delim.join(status) if status else str(Tags.Pass)
-
-
-@dataclass
-class Strand:
-    forward_covg: int = 0
-    reverse_covg: int = 0
-
-    @property
-    def ratio(self) -> float:
-        try:
-            return min(self.covgs) / sum(self.covgs)
-        except ZeroDivisionError:
-            return 1.0
-
-    @property
-    def covgs(self) -> Tuple[int, int]:
-        return self.forward_covg, self.reverse_covg
+# the tags filter statistics are reported for
+STATS_TAGS: Tuple[str, ...] = tuple(tag for _, tag in FILTER_BITS) + (PASS,)
 
-    @staticmethod
-    def from_variant(variant: Variant, sample_idx: int = 0) -> "Strand":
-        gt_idx = Genotype.from_arr(variant.genotypes[sample_idx]).allele_index()
-        fwd_covg = variant.format(Tags.FwdCovg.value)[sample_idx][gt_idx]
-        rev_covg = variant.format(Tags.RevCovg.value)[sample_idx][gt_idx]
 
-        return Strand(fwd_covg, rev_covg)
+def filter_string(mask: int, delim: str = ";") -> str:
+    """Convert a filter mask into the string for the FILTER field"""
+    status = [tag for bit, tag in FILTER_BITS if mask & bit]
+    return delim.join(status) if status else PASS
 
 
 class DepthTagError(Exception):
@@ -152,101 +83,273 @@ class Filter:
                 f"{self.min_covg:.1f} > {self.max_covg:.1f}"
             )
 
-    def _is_low_covg(self, variant: Variant) -> bool:
-        variant_covg = get_covg(variant)
-        return variant_covg < self.min_covg if self.min_covg else False
-
-    def _is_high_covg(self, variant: Variant) -> bool:
-        variant_covg = get_covg(variant)
-        return variant_covg > self.max_covg if self.max_covg else False
-
-    def _is_low_gt_conf(self, variant: Variant) -> bool:
-        gt_conf = get_gt_conf(variant)
-        return gt_conf < self.min_gt_conf
+        self._all_disabled = not (
+            self.min_covg
+            or self.max_covg
+            or self.min_strand_bias
+            or self.min_gt_conf
+            or self.max_gaps
+        )
+        # there are only 32 possible filter statuses so we build their strings once
+        self._filter_strings: List[str] = [
+            filter_string(mask) for mask in range(NUM_FILTER_MASKS)
+        ]
+        self._filter_bytes: List[bytes] = [
+            status.encode("ascii") for status in self._filter_strings
+        ]
 
-    def _is_high_gaps(self, variant: Variant) -> bool:
-        gaps = get_gaps(variant)
-        return gaps > self.max_gaps
+    @property
+    def needs_format(self) -> bool:
+        """Whether any filter is enabled, and so FORMAT fields have to be parsed"""
+        return not self._all_disabled
 
     def filter_status(self, variant: Variant) -> str:
-        status = FilterStatus()
-        if self.min_covg or self.max_covg:
-            status.low_covg = self._is_low_covg(variant)
-            status.high_covg = self._is_high_covg(variant)
-
-        if self.min_gt_conf:
-            status.low_gt_conf = self._is_low_gt_conf(variant)
+        """The filter status of a single variant. This goes through the same code as
+        a chunk of variants, so there is only one implementation of the filters.
+        """
+        return self.filter_chunk([variant])[0]
 
-        if self.min_strand_bias:
-            strand = Strand.from_variant(variant)
+    def filter_chunk(self, variants: List[Variant], sample_idx: int = 0) -> List[str]:
+        """Get the filter status for a chunk of variants. Each FORMAT tag is pulled
+        out of the variants once and the filters are evaluated over the whole chunk.
+        """
+        masks = self.chunk_masks(variants, sample_idx=sample_idx)
+        return self.filter_strings(masks)
+
+    def filter_strings(self, masks: np.ndarray) -> List[str]:
+        if self._all_disabled:
+            return [PASS] * len(masks)
+        return [self._filter_strings[mask] for mask in masks.tolist()]
+
+    def filter_bytes(self, masks: np.ndarray) -> List[bytes]:
+        """As filter_strings, but already encoded for writing raw VCF lines"""
+        if self._all_disabled:
+            return [PASS_BYTES] * len(masks)
+        return [self._filter_bytes[mask] for mask in masks.tolist()]
+
+    def chunk_masks(self, variants: List[Variant], sample_idx: int = 0) -> np.ndarray:
+        masks = np.zeros(len(variants), dtype=np.uint8)
+        if not variants or self._all_disabled:
+            return masks
+
+        gt_idx = None
+        if self.min_covg or self.max_covg or self.min_strand_bias or self.max_gaps:
+            genotypes = stack_genotypes(v.genotypes[sample_idx] for v in variants)
+            gt_idx = allele_indices(genotypes).tolist()
+
+        if self.min_covg or self.max_covg or self.min_strand_bias:
+            fwd_covg = select_format(variants, FWD_COVG, gt_idx, sample_idx)
+            rev_covg = select_format(variants, REV_COVG, gt_idx, sample_idx)
+            covg = fwd_covg + rev_covg
+
+            if self.min_covg:
+                masks[covg < self.min_covg] |= LOW_COVG_BIT
+            if self.max_covg:
+                masks[covg > self.max_covg] |= HIGH_COVG_BIT
+            if self.min_strand_bias:
+                # clamping the denominator avoids dividing by 0; a variant with no
+                # covg can't be strand biased so those are excluded afterwards
+                ratio = np.minimum(fwd_covg, rev_covg) / np.maximum(covg, TINY)
+                biased = (ratio < self.min_strand_bias) & (covg > 0)
+                masks[biased] |= STRAND_BIAS_BIT
 
-            status.strand_bias = strand.ratio < self.min_strand_bias
+        if self.min_gt_conf:
+            gt_conf = select_format(variants, GT_CONF, sample_idx=sample_idx)
+            masks[gt_conf < self.min_gt_conf] |= LOW_GT_CONF_BIT
 
         if self.max_gaps != 0:
-            status.high_gaps = self._is_high_gaps(variant)
+            gaps = select_format(variants, GAPS, gt_idx, sample_idx)
+            masks[gaps > self.max_gaps] |= HIGH_GAPS_BIT
 
-        return str(status)
+        return masks
 
     def add_filters_to_header(self, vcf: VCF):
         if self.min_covg > 0:
             header = {
-                "ID": str(Tags.LowCovg),
+                "ID": LOW_COVG,
                 "Description": f"Kmer coverage on called allele less than {self.min_covg}",
             }
             vcf.add_filter_to_header(header)
-            logging.debug(f"Header for min. covg: {header}")
+            logging.debug("Header for min. covg: %s", header)
 
         if self.max_covg > 0:
             header = {
-                "ID": str(Tags.HighCovg),
+                "ID": HIGH_COVG,
                 "Description": f"Kmer coverage on called allele more than {self.max_covg}",
             }
             vcf.add_filter_to_header(header)
-            logging.debug(f"Header for max. covg: {header}")
+            logging.debug("Header for max. covg: %s", header)
 
         if self.min_gt_conf > 0:
             header = {
-                "ID": str(Tags.LowGtConf),
+                "ID": LOW_GT_CONF,
                 "Description": f"Genotype confidence score less than {self.min_gt_conf}",
             }
             vcf.add_filter_to_header(header)
-            logging.debug(f"Header for min. GT_CONF: {header}")
+            logging.debug("Header for min. GT_CONF: %s", header)
 
         if self.min_strand_bias > 0:
             header = {
-                "ID": str(Tags.StrandBias),
+                "ID": STRAND_BIAS,
                 "Description": (
                     f"A strand on the called allele has less than  "
                     f"{self.min_strand_bias:.2%} of the covg for that allele."
                 ),
             }
             vcf.add_filter_to_header(header)
-            logging.debug(f"Header for strand bias: {header}")
+            logging.debug("Header for strand bias: %s", header)
 
         if self.max_gaps > 0:
             header = {
-                "ID": str(Tags.HighGaps),
+                "ID": HIGH_GAPS,
                 "Description": (
                     f"Fraction of kmers covering allele with coverage gaps is greater "
                     f"than {self.max_gaps}."
                 ),
             }
             vcf.add_filter_to_header(header)
-            logging.debug(f"Header for max. gaps: {header}")
+            logging.debug("Header for max. gaps: %s", header)
+
+
+def select_format(
+    variants: List[Variant],
+    tag: str,
+    allele_idx: Optional[List[int]] = None,
+    sample_idx: int = 0,
+) -> np.ndarray:
+    """The value of a FORMAT tag for a sample on the given allele of each variant.
+    If no allele indices are given, the first value is used. Each array cyvcf2
+    returns is released as soon as its value is read, so the allocator can reuse
+    it instead of a whole chunk of arrays being held at once.
+    """
+    values = np.empty(len(variants), dtype=np.float64)
+    if allele_idx is None:
+        for i, variant in enumerate(variants):
+            values[i] = variant.format(tag)[sample_idx][0]
+    else:
+        for i, (variant, idx) in enumerate(zip(variants, allele_idx)):
+            values[i] = variant.format(tag)[sample_idx][idx]
+    return values
+
+
+def stack_genotypes(genotypes: Iterable[List[int]]) -> np.ndarray:
+    """Stack the genotypes of variants into an array of shape (variants, 2). A null
+    or missing allele is -1.
+    """
+    rows = [[a for a in gt if type(a) is int][:2] for gt in genotypes]
+    arr = np.full((len(rows), 2), -1, dtype=np.int64)
+    for i, row in enumerate(rows):
+        arr[i, : len(row)] = row
+    return arr
+
 
+def allele_indices(genotypes: np.ndarray) -> np.ndarray:
+    """The index of the called allele for each row of an array of genotypes. Null
+    calls are given the reference allele index.
+    """
+    is_het = (genotypes >= 0).all(axis=1) & (genotypes[:, 0] != genotypes[:, 1])
+    if is_het.any():
+        first_het = genotypes[is_het][0].tolist()
+        raise NotImplementedError(f"Het Genotype is unexpected: {first_het}")
+    return np.where(genotypes == -1, 0, genotypes).max(axis=1)
 
-def get_covg(variant: Variant, sample_idx: int = 0) -> int:
-    strand = Strand.from_variant(variant, sample_idx=sample_idx)
-    return sum(strand.covgs)
 
+def chunked(variants: Iterable[Variant], size: int) -> Iterator[List[Variant]]:
+    it = iter(variants)
+    chunk = list(islice(it, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(it, size))
 
-def get_gt_conf(variant: Variant, sample_idx: int = 0) -> float:
-    return variant.format(Tags.GtypeConf.value)[sample_idx][0]
 
+def prefetched(items: Iterator[T], executor: Executor) -> Iterator[T]:
+    """Pull the next item from an iterator in the background while the caller is
+    working on the current one.
+    """
+    sentinel = object()
+    future = executor.submit(next, items, sentinel)
+    while True:
+        item = future.result()
+        if item is sentinel:
+            return
+        future = executor.submit(next, items, sentinel)
+        yield item
+
+
+def filter_chunks(
+    variants: Iterable[Variant],
+    assessor: Filter,
+    executor: Optional[Executor] = None,
+) -> Iterator[Tuple[List[Variant], np.ndarray]]:
+    """Filter variants in chunks, yielding each chunk with its filter masks. If an
+    executor is given, the next chunk is read while the current chunk is being
+    filtered.
+    """
+    chunks = chunked(variants, CHUNK_SIZE)
+    if executor is not None:
+        chunks = prefetched(chunks, executor)
+    for chunk in chunks:
+        yield chunk, assessor.chunk_masks(chunk)
 
-def get_gaps(variant: Variant, sample_idx: int = 0) -> float:
-    gt_idx = Genotype.from_arr(variant.genotypes[sample_idx]).allele_index()
-    return variant.format(Tags.Gaps.value)[sample_idx][gt_idx]
+
+def new_filter_stats() -> "array[int]":
+    """Running counts for each of STATS_TAGS, in that order"""
+    return array("q", [0] * len(STATS_TAGS))
+
+
+def count_filters(masks: np.ndarray, stats: "array[int]"):
+    """Add the variants failing each filter to the counts in stats. The last count
+    is the number of variants that passed all filters.
+    """
+    for i, (bit, _) in enumerate(FILTER_BITS):
+        stats[i] += np.count_nonzero(masks & bit)
+    stats[-1] += np.count_nonzero(masks == 0)
+
+
+def merge_filters(
+    current_filter: Optional[str], filter_status: str, overwrite: bool
+) -> str:
+    """Work out the new FILTER value for a variant. current_filter should be None if
+    the variant's FILTER is PASS or missing. When not overwriting, a passing variant
+    keeps its existing filters and current_filter itself is returned, so callers can
+    tell by identity that nothing needs rewriting.
+    """
+    if overwrite or current_filter is None:
+        return filter_status
+    if filter_status == PASS:
+        return current_filter
+    if current_filter.endswith(";"):
+        current_filter = current_filter[:-1]
+    return "".join((current_filter, ";", filter_status))
+
+
+def rewrite_filter_column(line: bytes, filter_status: bytes, overwrite: bool) -> bytes:
+    """Replace the FILTER column of a raw VCF record line, leaving the rest of the
+    line untouched. The FILTER value is merged as in merge_filters, but on bytes so
+    lines never need decoding and encoding.
+    """
+    fields = line.split(b"\t", FILTER_COL + 1)
+    current_filter = fields[FILTER_COL]
+    if overwrite or current_filter in (PASS_BYTES, MISSING_BYTES):
+        fields[FILTER_COL] = filter_status
+    elif filter_status == PASS_BYTES:
+        return line
+    else:
+        if current_filter.endswith(b";"):
+            current_filter = current_filter[:-1]
+        fields[FILTER_COL] = b";".join((current_filter, filter_status))
+    return b"\t".join(fields)
+
+
+def is_text_vcf(path: str) -> bool:
+    return path.endswith((".vcf", ".vcf.gz"))
+
+
+def open_text_vcf(path: str) -> BinaryIO:
+    """Open a text VCF for reading its raw lines as bytes"""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode="rb")
+    return open(path, mode="rb")
 
 
 @click.command()
@@ -271,7 +374,7 @@ def get_gaps(variant: Variant, sample_idx: int = 0) -> float:
     "-d",
     "--min-covg",
     help=(
-        f"Minimum kmer coverage for the called allele of a position. This filter has ID: {Tags.LowCovg}. "
+        f"Minimum kmer coverage for the called allele of a position. This filter has ID: {LOW_COVG}. "
         f"Set to 0 to disable"
     ),
     default=0,
@@ -281,7 +384,7 @@ def get_gaps(variant: Variant, sample_idx: int = 0) -> float:
     "-D",
     "--max-covg",
     help=(
-        "Maximum kmer coverage for the called allele of a position. This filter has ID: {Tags.HighDepth}. "
+        f"Maximum kmer coverage for the called allele of a position. This filter has ID: {HIGH_COVG}. "
         "Set to 0 to disable"
     ),
     default=0,
@@ -292,7 +395,7 @@ def get_gaps(variant: Variant, sample_idx: int = 0) -> float:
     "--min-strand-bias",
     help=(
         "Filter a variant if either strand has less than INT% of the kmer coverage "
-        f"on the called allele. This filter has ID: {Tags.StrandBias}. Set to 0 to "
+        f"on the called allele. This filter has ID: {STRAND_BIAS}. Set to 0 to "
         f"disable"
     ),
     type=click.IntRange(0, 50),
@@ -305,7 +408,7 @@ def get_gaps(variant: Variant, sample_idx: int = 0) -> float:
     "--max-gaps",
     help=(
         f"Maximum fraction of coverage gaps for a variant. This filter has ID: "
-        f"{Tags.HighGaps}. Set to 0 to disable"
+        f"{HIGH_GAPS}. Set to 0 to disable"
     ),
     default=0.0,
     show_default=True,
@@ -314,8 +417,8 @@ def get_gaps(variant: Variant, sample_idx: int = 0) -> float:
     "-g",
     "--min-gt-conf",
     help=(
-        f"Minimum genotype confidence ({Tags.GtypeConf}) score for a variant. "
-        f"This filter has ID: {Tags.LowGtConf}. Set to 0 to disable"
+        f"Minimum genotype confidence ({GT_CONF}) score for a variant. "
+        f"This filter has ID: {LOW_GT_CONF}. Set to 0 to disable"
     ),
     default=0.0,
     show_default=True,
@@ -327,11 +430,24 @@ def get_gaps(variant: Variant, sample_idx: int = 0) -> float:
     show_default=True,
     help="Overwrite existing information in FILTER field.",
 )
+@click.option(
+    "-t",
+    "--threads",
+    help=(
+        "Number of threads to use. Extra threads are used by htslib for "
+        "(de)compression and to read the next chunk of variants while the current one "
+        "is being filtered."
+    ),
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+)
 @click.option("-v", "--verbose", help="Turns on debug-level logging.", is_flag=True)
 def main(
     in_vcf: str,
     out_vcf: str,
     overwrite: bool,
+    threads: int,
     verbose: bool,
     min_covg: int,
     max_covg: int,
@@ -361,36 +477,64 @@ def main(
         max_gaps=max_gaps,
     )
 
-    vcf_reader = VCF(in_vcf)
+    vcf_reader = VCF(in_vcf, threads=threads)
     assessor.add_filters_to_header(vcf_reader)
-    vcf_writer = Writer(out_vcf, tmpl=vcf_reader)
 
-    stats = Counter()
-    logging.info("Filtering variants...")
-    for variant in vcf_reader:
-        filter_status = assessor.filter_status(variant)
-
-        if (
-            (not overwrite)
-            and variant.FILTER is not None
-            and filter_status != str(Tags.Pass)
-        ):
-            current_filter = variant.FILTER.rstrip(";")
-            variant.FILTER = f"{current_filter};{filter_status}"
-        else:
-            variant.FILTER = filter_status
+    executor = ThreadPoolExecutor(max_workers=1) if threads > 1 else None
 
-        vcf_writer.write_record(variant)
-
-        stats.update(filter_status.split(";"))
+    stats = new_filter_stats()
+    logging.info("Filtering variants...")
+    filtered_chunks = filter_chunks(vcf_reader, assessor, executor=executor)
+    # only the FILTER column changes, so when both files are text VCFs we copy the
+    # input lines instead of having htslib re-encode every record
+    copy_lines = is_text_vcf(in_vcf) and (out_vcf == "-" or out_vcf.endswith(".vcf"))
+    if copy_lines:
+        logging.debug("Copying input records with the FILTER column replaced")
+        with open_text_vcf(in_vcf) as in_stream, click.open_file(
+            out_vcf, mode="wb"
+        ) as out_stream:
+            out_stream.write(vcf_reader.raw_header.encode())
+            lines = (line for line in in_stream if not line.startswith(b"#"))
+            if not assessor.needs_format:
+                # every variant passes, so the records never need to be parsed
+                logging.debug("No filters enabled, skipping record parsing")
+                num_variants = 0
+                for line in lines:
+                    out_stream.write(rewrite_filter_column(line, PASS_BYTES, overwrite))
+                    num_variants += 1
+                stats[-1] += num_variants
+            else:
+                for _, masks in filtered_chunks:
+                    # the statuses must come first in zip so no extra line is consumed
+                    statuses = assessor.filter_bytes(masks)
+                    for filter_status, line in zip(statuses, lines):
+                        out_stream.write(
+                            rewrite_filter_column(line, filter_status, overwrite)
+                        )
+                    count_filters(masks, stats)
+    else:
+        vcf_writer = Writer(out_vcf, tmpl=vcf_reader)
+        if threads > 1:
+            vcf_writer.set_threads(threads)
+        for chunk, masks in filtered_chunks:
+            for variant, filter_status in zip(chunk, assessor.filter_strings(masks)):
+                current_filter = variant.FILTER
+                new_filter = merge_filters(current_filter, filter_status, overwrite)
+                if new_filter is not current_filter:
+                    variant.FILTER = new_filter
+                vcf_writer.write_record(variant)
+            count_filters(masks, stats)
+        vcf_writer.close()
 
     vcf_reader.close()
-    vcf_writer.close()
+    if executor is not None:
+        executor.shutdown()
 
     logging.info("FILTER STATISTICS")
     logging.info("=================")
-    for filt, count in stats.items():
-        logging.info(f"Filter: {filt}\tCount: {count}")
+    for tag, count in zip(STATS_TAGS, stats):
+        if count:
+            logging.info(f"Filter: {tag}\tCount: {count}")
 
     logging.info("Done!")
 
@@ -1,118 +1,73 @@
-from unittest.mock import patch, call
+from unittest.mock import MagicMock
 
 from apply_filters import *
 from pytest import raises
 
 
-class TestGetCovg:
-    @patch.object(Strand, Strand.from_variant.__name__)
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_covgTagPresent_returnsCovg(self, mocked_variant, mocked_strand):
-        fwd_covg = 6
-        rev_covg = 1
-        mocked_strand.return_value = Strand(fwd_covg, rev_covg)
+def make_variant(
+    genotype: List[int], fwd=(0,), rev=(0,), gaps=(0.0,), gt_conf=0.0
+) -> MagicMock:
+    variant = MagicMock()
+    variant.genotypes = [genotype]
+    tags = {
+        FWD_COVG: [list(fwd)],
+        REV_COVG: [list(rev)],
+        GAPS: [list(gaps)],
+        GT_CONF: [[gt_conf]],
+    }
+    variant.format.side_effect = lambda tag: tags[tag]
+    return variant
 
-        actual = get_covg(mocked_variant)
-        expected = fwd_covg + rev_covg
-
-        assert actual == expected
-
-
-@patch("cyvcf2.Variant", autospec=True, create=True)
-def test_get_gt_conf(mocked_variant):
-    expected = 20.7
-    mocked_variant.format.return_value = [[expected]]
-
-    actual = get_gt_conf(mocked_variant)
-
-    assert actual == expected
-
-    calls = [
-        call(Tags.GtypeConf.value),
-    ]
-    mocked_variant.format.assert_has_calls(calls, any_order=False)
 
+def called_allele(genotype: List[int]) -> int:
+    return allele_indices(stack_genotypes([genotype]))[0]
 
-@patch("cyvcf2.Variant", autospec=True, create=True)
-def test_get_gaps(mocked_variant):
-    mocked_variant.format.return_value = [[0, 0.5]]
-    mocked_variant.genotypes = [[1]]
 
-    actual = get_gaps(mocked_variant)
-    expected = 0.5
+class TestAlleleIndices:
+    def test_nullCall_returnsRef(self):
+        assert called_allele([-1, False]) == 0
 
-    assert actual == expected
-
-    calls = [
-        call(Tags.Gaps.value),
-    ]
-    mocked_variant.format.assert_has_calls(calls, any_order=False)
-
-
-class TestGetStrandCovgs:
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_noCovgTag_raiseError(self, mocked_variant):
-        mocked_variant.format.side_effect = KeyError
-        mocked_variant.genotypes = [[0]]
-
-        with raises(KeyError):
-            strand = Strand.from_variant(mocked_variant)
-
-        calls = [
-            call(Tags.FwdCovg.value),
-        ]
-        mocked_variant.format.assert_has_calls(calls, any_order=False)
+    def test_homRef_returnsRef(self):
+        assert called_allele([0, False]) == 0
 
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_covgTagsPresent_returnsCovgs(self, mocked_variant):
-        fwd_covg = 6
-        rev_covg = 2
-        mocked_variant.format.side_effect = [[[fwd_covg]], [[rev_covg]]]
-        mocked_variant.genotypes = [[0]]
-        strand = Strand.from_variant(mocked_variant)
+    def test_homAlt_returnsAlt(self):
+        assert called_allele([2, False]) == 2
 
-        actual = strand.covgs
-        expected = (fwd_covg, rev_covg)
+    def test_diploidHomAlt_returnsAlt(self):
+        assert called_allele([1, 1, False]) == 1
 
-        assert actual == expected
-
-        calls = [
-            call(Tags.FwdCovg.value),
-            call(Tags.RevCovg.value),
-        ]
-        mocked_variant.format.assert_has_calls(calls, any_order=False)
+    def test_het_raisesError(self):
+        with raises(NotImplementedError):
+            called_allele([0, 1, False])
 
 
-class TestFilterStatusStr:
+class TestFilterString:
     def test_noFilters_returnsPass(self):
-        status = FilterStatus()
-
-        actual = str(status)
-        expected = Tags.Pass.value
+        actual = filter_string(0)
+        expected = PASS
 
         assert actual == expected
 
     def test_allFilters_returnsAllInStr(self):
         delim = ";"
-        status = FilterStatus(
-            low_covg=True,
-            high_covg=True,
-            high_gaps=True,
-            strand_bias=True,
-            low_gt_conf=True,
-            delim=delim,
+        mask = (
+            LOW_COVG_BIT
+            | HIGH_COVG_BIT
+            | HIGH_GAPS_BIT
+            | STRAND_BIAS_BIT
+            | LOW_GT_CONF_BIT
         )
 
-        actual = str(status)
+        actual = filter_string(mask, delim=delim)
         expected = delim.join(
             map(
                 str,
                 [
-                    Tags.LowCovg,
-                    Tags.HighCovg,
-                    Tags.LowGtConf,
-                    Tags.StrandBias,
-                    Tags.HighGaps,
+                    LOW_COVG,
+                    HIGH_COVG,
+                    LOW_GT_CONF,
+                    STRAND_BIAS,
+                    HIGH_GAPS,
                 ],
             )
         )
@@ -121,112 +76,87 @@ class TestFilterStatusStr:
 
     def test_oneFilter_returnsOneWithoutDelim(self):
         delim = ";"
-        status = FilterStatus(strand_bias=True, delim=delim,)
 
-        actual = str(status)
-        expected = str(Tags.StrandBias)
+        actual = filter_string(STRAND_BIAS_BIT, delim=delim)
+        expected = STRAND_BIAS
 
         assert actual == expected
 
 
 class TestFilterFilterStatus:
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_noFilters_returnsPass(self, mocked_variant):
+    def test_noFilters_returnsPass(self):
         assessor = Filter()
+        variant = make_variant([0])
 
-        actual = assessor.filter_status(mocked_variant)
-        expected = str(FilterStatus())
+        actual = assessor.filter_status(variant)
+        expected = PASS
 
         assert actual == expected
 
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_lowCovgOnAndVarHasLowCovg(self, mocked_variant):
-        min_covg = 10
-        assessor = Filter(min_covg=min_covg)
-        variant_covg = 9
+    def test_lowCovgOnAndVarHasLowCovg(self):
+        assessor = Filter(min_covg=10)
+        variant = make_variant([0], fwd=(9,))
 
-        with patch("apply_filters.get_covg", return_value=variant_covg):
-            actual = assessor.filter_status(mocked_variant)
-        expected = str(FilterStatus(low_covg=True))
+        actual = assessor.filter_status(variant)
+        expected = filter_string(LOW_COVG_BIT)
 
         assert actual == expected
 
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_lowCovgOnAndVarHasGoodCovg(self, mocked_variant):
-        min_covg = 9
-        assessor = Filter(min_covg=min_covg)
-        variant_covg = 12
+    def test_lowCovgOnAndVarHasGoodCovg(self):
+        assessor = Filter(min_covg=9)
+        variant = make_variant([0], fwd=(12,))
 
-        with patch("apply_filters.get_covg", return_value=variant_covg):
-            actual = assessor.filter_status(mocked_variant)
-        expected = str(Tags.Pass)
+        actual = assessor.filter_status(variant)
+        expected = PASS
 
         assert actual == expected
 
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_lowCovgOnAndVarHasMinCovg(self, mocked_variant):
-        min_covg = 9
-        assessor = Filter(min_covg=min_covg)
-        variant_covg = 9
+    def test_lowCovgOnAndVarHasMinCovg(self):
+        assessor = Filter(min_covg=9)
+        variant = make_variant([0], fwd=(9,))
 
-        with patch("apply_filters.get_covg", return_value=variant_covg):
-            actual = assessor.filter_status(mocked_variant)
-        expected = str(Tags.Pass)
+        actual = assessor.filter_status(variant)
+        expected = PASS
 
         assert actual == expected
 
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_maxCovgOnAndVarHasHighCovg(self, mocked_variant):
-        max_covg = 20
-        assessor = Filter(max_covg=max_covg)
-        variant_covg = 201
+    def test_maxCovgOnAndVarHasHighCovg(self):
+        assessor = Filter(max_covg=20)
+        variant = make_variant([0], fwd=(201,))
 
-        with patch("apply_filters.get_covg", return_value=variant_covg):
-            actual = assessor.filter_status(mocked_variant)
-        expected = str(FilterStatus(high_covg=True))
+        actual = assessor.filter_status(variant)
+        expected = filter_string(HIGH_COVG_BIT)
 
         assert actual == expected
 
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_maxCovgOnAndVarHasOkCovg(self, mocked_variant):
-        max_covg = 20
-        assessor = Filter(max_covg=max_covg)
-        variant_covg = 2
+    def test_maxCovgOnAndVarHasOkCovg(self):
+        assessor = Filter(max_covg=20)
+        variant = make_variant([0], fwd=(2,))
 
-        with patch("apply_filters.get_covg", return_value=variant_covg):
-            actual = assessor.filter_status(mocked_variant)
-        expected = str(Tags.Pass)
+        actual = assessor.filter_status(variant)
+        expected = PASS
 
         assert actual == expected
 
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_maxCovgOnAndVarHasMaxCovg(self, mocked_variant):
-        max_covg = 20
-        assessor = Filter(max_covg=max_covg)
-        variant_covg = 20
+    def test_maxCovgOnAndVarHasMaxCovg(self):
+        assessor = Filter(max_covg=20)
+        variant = make_variant([0], fwd=(20,))
 
-        with patch("apply_filters.get_covg", return_value=variant_covg):
-            actual = assessor.filter_status(mocked_variant)
-        expected = str(Tags.Pass)
+        actual = assessor.filter_status(variant)
+        expected = PASS
 
         assert actual == expected
 
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_bothCovgFiltersOnAndVarHasExpectedCovg(self, mocked_variant):
-        min_covg = 5
-        max_covg = 20
-        assessor = Filter(max_covg=max_covg, min_covg=min_covg)
-        variant_covg = 15
+    def test_bothCovgFiltersOnAndVarHasExpectedCovg(self):
+        assessor = Filter(max_covg=20, min_covg=5)
+        variant = make_variant([0], fwd=(15,))
 
-        with patch("apply_filters.get_covg", return_value=variant_covg):
-            actual = assessor.filter_status(mocked_variant)
-        expected = str(Tags.Pass)
+        actual = assessor.filter_status(variant)
+        expected = PASS
 
         assert actual == expected
 
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_bothCovgFiltersOnAndMaxLowerThanMin_raisesError(self, mocked_variant):
-        expected_covg = 100
+    def test_bothCovgFiltersOnAndMaxLowerThanMin_raisesError(self):
         max_covg = 0.2
         min_covg = 0.5
 
@@ -234,204 +164,384 @@ class TestFilterFilterStatus:
             Filter(max_covg=max_covg, min_covg=min_covg)
             assert "Minimum covg is more than maximum covg" in err
 
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_bothCovgFiltersOnAndVarHasLowCovg(self, mocked_variant):
-        min_covg = 5
-        max_covg = 20
-        assessor = Filter(max_covg=max_covg, min_covg=min_covg)
-        variant_covg = 1
+    def test_bothCovgFiltersOnAndVarHasLowCovg(self):
+        assessor = Filter(max_covg=20, min_covg=5)
+        variant = make_variant([0], fwd=(1,))
+
+        actual = assessor.filter_status(variant)
+        expected = filter_string(LOW_COVG_BIT)
+
+        assert actual == expected
+
+    def test_bothCovgFiltersOnAndVarHasHighCovg(self):
+        assessor = Filter(max_covg=20, min_covg=5)
+        variant = make_variant([0], fwd=(100,))
+
+        actual = assessor.filter_status(variant)
+        expected = filter_string(HIGH_COVG_BIT)
+
+        assert actual == expected
+
+    def test_covgOnAndVarIsAlt_usesAltCovg(self):
+        assessor = Filter(min_covg=10)
+        variant = make_variant([1], fwd=(20, 4), rev=(20, 4))
+
+        actual = assessor.filter_status(variant)
+        expected = filter_string(LOW_COVG_BIT)
 
-        with patch("apply_filters.get_covg", return_value=variant_covg):
-            actual = assessor.filter_status(mocked_variant)
-        expected = str(FilterStatus(low_covg=True))
+        assert actual == expected
+
+    def test_lowGtConfOnAndVarHasHighGtConf(self):
+        assessor = Filter(min_gt_conf=1.1)
+        variant = make_variant([0], gt_conf=2.2)
+
+        actual = assessor.filter_status(variant)
+        expected = PASS
+
+        assert actual == expected
+
+    def test_lowGtConfOnAndVarHasLowGtConf(self):
+        assessor = Filter(min_gt_conf=1.1)
+        variant = make_variant([0], gt_conf=0.5)
+
+        actual = assessor.filter_status(variant)
+        expected = filter_string(LOW_GT_CONF_BIT)
+
+        assert actual == expected
+
+    def test_lowGtConfOnAndVarHasMinGtConf(self):
+        assessor = Filter(min_gt_conf=1.1)
+        variant = make_variant([0], gt_conf=1.1)
+
+        actual = assessor.filter_status(variant)
+        expected = PASS
 
         assert actual == expected
 
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_bothCovgFiltersOnAndVarHasHighCovg(self, mocked_variant):
-        min_covg = 5
-        max_covg = 20
-        assessor = Filter(max_covg=max_covg, min_covg=min_covg)
-        variant_covg = 100
+    def test_lowGtConfOnAndVarHasMinGtConfMinusOne(self):
+        assessor = Filter(min_gt_conf=1.1)
+        variant = make_variant([0], gt_conf=1.09)
 
-        with patch("apply_filters.get_covg", return_value=variant_covg):
-            actual = assessor.filter_status(mocked_variant)
-        expected = str(FilterStatus(high_covg=True))
+        actual = assessor.filter_status(variant)
+        expected = filter_string(LOW_GT_CONF_BIT)
 
         assert actual == expected
 
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_lowGtConfOnAndVarHasHighGtConf(self, mocked_variant):
-        min_gt_conf = 1.1
-        assessor = Filter(min_gt_conf=min_gt_conf)
-        variant_gt_conf = 2.2
+    def test_lowGtConfLowCovgOnAndVarFailsBoth(self):
+        assessor = Filter(min_covg=9, min_gt_conf=1.1)
+        variant = make_variant([0], fwd=(4,), gt_conf=0.8)
 
-        with patch("apply_filters.get_gt_conf", return_value=variant_gt_conf):
-            actual = assessor.filter_status(mocked_variant)
-        expected = str(FilterStatus())
+        actual = assessor.filter_status(variant)
+        expected = filter_string(LOW_GT_CONF_BIT | LOW_COVG_BIT)
 
         assert actual == expected
 
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_lowGtConfOnAndVarHasLowGtConf(self, mocked_variant):
-        min_gt_conf = 1.1
-        assessor = Filter(min_gt_conf=min_gt_conf)
-        variant_gt_conf = 0.5
+    def test_strandBiasOnAndVarHasNoBias(self):
+        assessor = Filter(min_strand_bias=25)
+        variant = make_variant([0], fwd=(5,), rev=(5,))
 
-        with patch("apply_filters.get_gt_conf", return_value=variant_gt_conf):
-            actual = assessor.filter_status(mocked_variant)
-        expected = str(FilterStatus(low_gt_conf=True))
+        actual = assessor.filter_status(variant)
+        expected = PASS
 
         assert actual == expected
 
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_lowGtConfOnAndVarHasMinGtConf(self, mocked_variant):
-        min_gt_conf = 1.1
-        assessor = Filter(min_gt_conf=min_gt_conf)
-        variant_gt_conf = 1.1
+    def test_strandBiasOnAndVarHasBias(self):
+        assessor = Filter(min_strand_bias=25)
+        variant = make_variant([0], fwd=(5,), rev=(1,))
 
-        with patch("apply_filters.get_gt_conf", return_value=variant_gt_conf):
-            actual = assessor.filter_status(mocked_variant)
-        expected = str(FilterStatus())
+        actual = assessor.filter_status(variant)
+        expected = filter_string(STRAND_BIAS_BIT)
 
         assert actual == expected
 
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_lowGtConfOnAndVarHasMinGtConfMinusOne(self, mocked_variant):
-        min_gt_conf = 1.1
-        assessor = Filter(min_gt_conf=min_gt_conf)
-        variant_gt_conf = 1.09
+    def test_strandBiasOnAndVarHasNoCovg(self):
+        assessor = Filter(min_strand_bias=25)
+        variant = make_variant([0], fwd=(0,), rev=(0,))
 
-        with patch("apply_filters.get_gt_conf", return_value=variant_gt_conf):
-            actual = assessor.filter_status(mocked_variant)
-        expected = str(FilterStatus(low_gt_conf=True))
+        actual = assessor.filter_status(variant)
+        expected = PASS
 
         assert actual == expected
 
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_lowGtConfLowCovgOnAndVarFailsBoth(self, mocked_variant):
-        min_gt_conf = 1.1
-        min_covg = 9
-        assessor = Filter(min_covg=min_covg, min_gt_conf=min_gt_conf)
-        variant_covg = 4
-        variant_gt_conf = 0.8
+    def test_strandBiasOnAndVarIsNull_usesRef(self):
+        assessor = Filter(min_strand_bias=25)
+        variant = make_variant([-1], fwd=(6, 0), rev=(1, 0))
 
-        with patch("apply_filters.get_covg", return_value=variant_covg), patch(
-            "apply_filters.get_gt_conf", return_value=variant_gt_conf
-        ):
-            actual = assessor.filter_status(mocked_variant)
-        expected = str(FilterStatus(low_gt_conf=True, low_covg=True))
+        actual = assessor.filter_status(variant)
+        expected = filter_string(STRAND_BIAS_BIT)
 
         assert actual == expected
 
-    @patch.object(Strand, Strand.from_variant.__name__)
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_strandBiasOnAndVarHasNoBias(self, mocked_variant, mocked_strand):
-        bias = 25
-        assessor = Filter(min_strand_bias=bias)
-        strand_covgs = Strand(5, 5)
-        mocked_strand.return_value = strand_covgs
+    def test_strandBiasOnAndVarBiasIsOnLimit(self):
+        assessor = Filter(min_strand_bias=25)
+        variant = make_variant([0], fwd=(15,), rev=(5,))
 
-        actual = assessor.filter_status(mocked_variant)
-        expected = str(FilterStatus())
+        actual = assessor.filter_status(variant)
+        expected = PASS
 
         assert actual == expected
 
-    @patch.object(Strand, Strand.from_variant.__name__)
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_strandBiasOnAndVarHasBias(self, mocked_variant, mocked_strand):
-        bias = 25
-        assessor = Filter(min_strand_bias=bias)
-        strand_covgs = Strand(5, 1)
-        mocked_strand.return_value = strand_covgs
+    def test_strandBiasOnAndVarBiasIsOneBelowLimit(self):
+        assessor = Filter(min_strand_bias=25)
+        variant = make_variant([0], fwd=(24,), rev=(76,))
 
-        actual = assessor.filter_status(mocked_variant)
-        expected = str(FilterStatus(strand_bias=True))
+        actual = assessor.filter_status(variant)
+        expected = filter_string(STRAND_BIAS_BIT)
 
         assert actual == expected
 
-    @patch.object(Strand, Strand.from_variant.__name__)
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_strandBiasOnAndVarHasNoCovg(self, mocked_variant, mocked_strand):
-        bias = 25
-        assessor = Filter(min_strand_bias=bias)
-        strand_covgs = Strand(0, 0)
-        mocked_strand.return_value = strand_covgs
+    def test_strandBiasOnAndVarIsHet(self):
+        assessor = Filter(min_strand_bias=25)
+        variant = make_variant([0, 1])
+
+        with raises(NotImplementedError):
+            assessor.filter_status(variant)
+
+    def test_maxGapsOnAndVarHasLowGaps(self):
+        assessor = Filter(max_gaps=0.5)
+        variant = make_variant([0], gaps=(0.3,))
 
-        actual = assessor.filter_status(mocked_variant)
-        expected = str(FilterStatus())
+        actual = assessor.filter_status(variant)
+        expected = PASS
 
         assert actual == expected
 
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_strandBiasOnAndVarIsNull_usesRef(self, mocked_variant):
-        bias = 25
-        assessor = Filter(min_strand_bias=bias)
-        mocked_variant.genotypes = [[-1]]
-        fwd_covg = 6
-        rev_covg = 1
-        mocked_variant.format.side_effect = [[[fwd_covg, 0]], [[rev_covg, 0]]]
+    def test_maxGapsOnAndVarHasHighGaps(self):
+        assessor = Filter(max_gaps=0.5)
+        variant = make_variant([0], gaps=(0.6,))
 
-        actual = assessor.filter_status(mocked_variant)
-        expected = str(FilterStatus(strand_bias=True))
+        actual = assessor.filter_status(variant)
+        expected = filter_string(HIGH_GAPS_BIT)
+
+        assert actual == expected
+
+    def test_missingCovgTag_raisesError(self):
+        assessor = Filter(min_covg=5)
+        variant = make_variant([0])
+        variant.format.side_effect = KeyError
+
+        with raises(KeyError):
+            assessor.filter_status(variant)
+
+
+class TestFilterFilterChunk:
+    def test_emptyChunk_returnsEmpty(self):
+        assessor = Filter(min_covg=5)
+
+        actual = assessor.filter_chunk([])
+
+        assert actual == []
+
+    def test_noFilters_returnsPassWithoutFormatCalls(self):
+        assessor = Filter()
+        variant = make_variant([1, False])
+
+        actual = assessor.filter_chunk([variant])
+        expected = [PASS]
+
+        assert actual == expected
+        variant.format.assert_not_called()
+
+    def test_covgFilters_usesCalledAllele(self):
+        assessor = Filter(min_covg=5, max_covg=20)
+        variants = [
+            make_variant([0, False], fwd=(1, 10), rev=(1, 10)),
+            make_variant([1, False], fwd=(1, 10), rev=(1, 11)),
+            make_variant([-1, False], fwd=(10, 1), rev=(1, 1)),
+            make_variant([2, False], fwd=(1, 1, 3), rev=(1, 1, 3)),
+        ]
+
+        actual = assessor.filter_chunk(variants)
+        expected = [
+            filter_string(LOW_COVG_BIT),
+            filter_string(HIGH_COVG_BIT),
+            PASS,
+            PASS,
+        ]
 
         assert actual == expected
 
-    @patch.object(Strand, Strand.from_variant.__name__)
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_strandBiasOnAndVarBiasIsOnLimit(self, mocked_variant, mocked_strand):
-        bias = 25
-        assessor = Filter(min_strand_bias=bias)
-        strand_covgs = Strand(15, 5)
-        mocked_strand.return_value = strand_covgs
+    def test_strandBias_noCovgIsNotBiased(self):
+        assessor = Filter(min_strand_bias=25)
+        variants = [
+            make_variant([0, False], fwd=(0,), rev=(0,)),
+            make_variant([0, False], fwd=(5,), rev=(1,)),
+            make_variant([0, False], fwd=(15,), rev=(5,)),
+        ]
 
-        actual = assessor.filter_status(mocked_variant)
-        expected = str(FilterStatus())
+        actual = assessor.filter_chunk(variants)
+        expected = [
+            PASS,
+            filter_string(STRAND_BIAS_BIT),
+            PASS,
+        ]
 
         assert actual == expected
 
-    @patch.object(Strand, Strand.from_variant.__name__)
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_strandBiasOnAndVarBiasIsOneBelowLimit(self, mocked_variant, mocked_strand):
-        bias = 25
-        assessor = Filter(min_strand_bias=bias)
-        strand_covgs = Strand(24, 76)
-        mocked_strand.return_value = strand_covgs
+    def test_gtConfAndGaps(self):
+        assessor = Filter(min_gt_conf=1.1, max_gaps=0.5)
+        variants = [
+            make_variant([1, False], gaps=(0.0, 0.6), gt_conf=0.5),
+            make_variant([0, False], gaps=(0.0, 0.6), gt_conf=1.1),
+        ]
 
-        actual = assessor.filter_status(mocked_variant)
-        expected = str(FilterStatus(strand_bias=True))
+        actual = assessor.filter_chunk(variants)
+        expected = [
+            filter_string(LOW_GT_CONF_BIT | HIGH_GAPS_BIT),
+            PASS,
+        ]
 
         assert actual == expected
 
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_strandBiasOnAndVarIsHet(self, mocked_variant):
-        bias = 25
-        assessor = Filter(min_strand_bias=bias)
-        mocked_variant.genotypes = [[0, 1]]
+    def test_hetVariant_raisesError(self):
+        assessor = Filter(min_strand_bias=25)
+        variants = [make_variant([0, False]), make_variant([0, 1, False])]
 
         with raises(NotImplementedError):
-            assessor.filter_status(mocked_variant)
+            assessor.filter_chunk(variants)
+
+
+class TestSelectFormat:
+    def test_alleleIndices_selectsCalledAlleles(self):
+        variants = [
+            make_variant([0], gaps=(0.1, 0.9)),
+            make_variant([1], gaps=(0.2, 0.8)),
+        ]
+
+        actual = select_format(variants, GAPS, allele_idx=[1, 0])
+        expected = np.array([0.9, 0.2])
+
+        assert np.array_equal(actual, expected)
+
+    def test_noAlleleIndices_selectsFirstValue(self):
+        variants = [make_variant([0], gt_conf=5.0), make_variant([1], gt_conf=2.5)]
+
+        actual = select_format(variants, GT_CONF)
+        expected = np.array([5.0, 2.5])
+
+        assert np.array_equal(actual, expected)
+
+
+def test_chunked():
+    actual = list(chunked(range(5), 2))
+    expected = [[0, 1], [2, 3], [4]]
+
+    assert actual == expected
+
+
+def test_filterBytes_encodedFilterStrings():
+    assessor = Filter(min_covg=1, max_gaps=0.5)
+    masks = np.array([0, LOW_COVG_BIT | HIGH_GAPS_BIT], dtype=np.uint8)
+
+    actual = assessor.filter_bytes(masks)
+    expected = [s.encode() for s in assessor.filter_strings(masks)]
+
+    assert actual == expected
+
+
+class TestMergeFilters:
+    def test_overwrite_returnsStatus(self):
+        actual = merge_filters("foo", LOW_COVG, overwrite=True)
+        expected = LOW_COVG
+
+        assert actual == expected
+
+    def test_noOverwriteAndNoCurrentFilter_returnsStatus(self):
+        actual = merge_filters(None, LOW_COVG, overwrite=False)
+        expected = LOW_COVG
+
+        assert actual == expected
+
+    def test_noOverwriteAndCurrentFilter_appendsStatus(self):
+        actual = merge_filters("foo;", LOW_COVG, overwrite=False)
+        expected = f"foo;{LOW_COVG}"
+
+        assert actual == expected
 
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_maxGapsOnAndVarHasLowGaps(self, mocked_variant):
-        max_gaps = 0.5
-        assessor = Filter(max_gaps=max_gaps)
-        variant_gaps = 0.3
+    def test_noOverwriteAndCurrentFilterPasses_keepsCurrentFilter(self):
+        current_filter = "foo"
+        actual = merge_filters(current_filter, PASS, overwrite=False)
 
-        with patch("apply_filters.get_gaps", return_value=variant_gaps):
-            actual = assessor.filter_status(mocked_variant)
-        expected = str(FilterStatus())
+        assert actual is current_filter
+
+
+class TestRewriteFilterColumn:
+    def test_passFilter_replacesColumn(self):
+        line = b"chr1\t5\t.\tA\tG\t.\tPASS\t.\tGT:GT_CONF\t1:5.2\n"
+
+        actual = rewrite_filter_column(line, HIGH_GAPS.encode(), overwrite=False)
+        expected = b"chr1\t5\t.\tA\tG\t.\thg\t.\tGT:GT_CONF\t1:5.2\n"
+
+        assert actual == expected
+
+    def test_existingFilterNoOverwrite_appendsToColumn(self):
+        line = b"chr1\t5\t.\tA\tG\t.\tfoo\t.\tGT:GT_CONF\t1:5.2\n"
+
+        actual = rewrite_filter_column(line, HIGH_GAPS.encode(), overwrite=False)
+        expected = b"chr1\t5\t.\tA\tG\t.\tfoo;hg\t.\tGT:GT_CONF\t1:5.2\n"
 
         assert actual == expected
 
-    @patch("cyvcf2.Variant", autospec=True, create=True)
-    def test_maxGapsOnAndVarHasHighGaps(self, mocked_variant):
-        max_gaps = 0.5
-        assessor = Filter(max_gaps=max_gaps)
-        variant_gaps = 0.6
+    def test_existingFilterNoOverwritePasses_lineUnchanged(self):
+        line = b"chr1\t5\t.\tA\tG\t.\tfoo\t.\tGT:GT_CONF\t1:5.2\n"
+
+        actual = rewrite_filter_column(line, PASS_BYTES, overwrite=False)
 
-        with patch("apply_filters.get_gaps", return_value=variant_gaps):
-            actual = assessor.filter_status(mocked_variant)
-        expected = str(FilterStatus(high_gaps=True))
+        assert actual is line
+
+    def test_existingFilterOverwrite_replacesColumn(self):
+        line = b"chr1\t5\t.\tA\tG\t.\tfoo\t.\tGT:GT_CONF\t1:5.2\n"
+
+        actual = rewrite_filter_column(line, HIGH_GAPS.encode(), overwrite=True)
+        expected = b"chr1\t5\t.\tA\tG\t.\thg\t.\tGT:GT_CONF\t1:5.2\n"
 
         assert actual == expected
+
+
+def test_prefetched_yieldsAllItemsInOrder():
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        actual = list(prefetched(iter(range(5)), executor))
+    expected = list(range(5))
+
+    assert actual == expected
+
+
+def test_countFilters():
+    masks = np.array(
+        [0, LOW_COVG_BIT, LOW_COVG_BIT | HIGH_GAPS_BIT, 0, STRAND_BIAS_BIT],
+        dtype=np.uint8,
+    )
+
+    stats = new_filter_stats()
+    count_filters(masks, stats)
+    count_filters(masks[:2], stats)
+
+    actual = stats.tolist()
+    expected = [3, 0, 0, 1, 1, 3]
+
+    assert actual == expected
+
+
+class TestFilterAllDisabled:
+    def test_noFiltersEnabled_doesNotNeedFormat(self):
+        assert not Filter().needs_format
+
+    def test_oneFilterEnabled_needsFormat(self):
+        assert Filter(max_gaps=0.5).needs_format
+
+    def test_filterStatus_returnsPassWithoutTouchingVariant(self):
+        assessor = Filter()
+        variant = MagicMock()
+
+        actual = assessor.filter_status(variant)
+
+        assert actual == PASS
+        variant.format.assert_not_called()
+
+    def test_filterChunk_returnsAllPass(self):
+        assessor = Filter()
+        variants = [make_variant([1, False]), make_variant([-1, False])]
+
+        actual = assessor.filter_chunk(variants)
+
+        assert actual == [PASS, PASS]
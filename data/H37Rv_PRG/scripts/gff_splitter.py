@@ -1,69 +1,60 @@
 #!/usr/bin/env python3
+import gzip
 import logging
-from collections import defaultdict
-from dataclasses import dataclass
+import os
+import stat
+import sys
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from multiprocessing import Pool
+from multiprocessing.pool import AsyncResult
 from pathlib import Path
-from enum import Enum
-from itertools import repeat
-from typing import TextIO, Tuple, Dict, List
+from typing import (
+    BinaryIO,
+    Deque,
+    Tuple,
+    Dict,
+    List,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Optional,
+    Union,
+)
 
 import click
-from intervaltree import IntervalTree, Interval
 
 Contig = str
-Seq = str
+Seq = Union[memoryview, "FaidxSeq"]
 Index = Dict[Contig, Seq]
+WHITESPACE = b" \t\n\r\x0b\x0c"
+MAX_WRITE_THREADS = 32
+
+
+class Interval(NamedTuple):
+    begin: int  # 0-based inclusive
+    end: int  # 0-based exclusive
+    data: str
 
+    def length(self) -> int:
+        return self.end - self.begin
 
-class Strand(Enum):
-    Forward = "+"
-    Reverse = "-"
-    NotRelevant = "."
-    Unknown = "?"
-
-    def __str__(self) -> str:
-        return str(self.value)
-
-
-@dataclass
-class GffFeature:
-    seqid: Contig
-    source: str
-    method: str  # correct term is type, but that is a python reserved variable name
-    start: int  # 1-based inclusive
-    end: int  # 1-based inclusive
-    score: float
-    strand: Strand
-    phase: int
-    attributes: Dict[str, str]
-
-    @staticmethod
-    def from_str(s: str) -> "GffFeature":
-        fields = s.split("\t")
-        score = 0 if fields[5] == "." else float(fields[5])
-        phase = -1 if fields[7] == "." else int(fields[7])
-        attr_fields = fields[-1].split(";")
-        attributes = {k: v for k, v in map(str.split, attr_fields, repeat("="))}
-        return GffFeature(
-            seqid=fields[0],
-            source=fields[1],
-            method=fields[2],
-            start=int(fields[3]),
-            end=int(fields[4]),
-            score=score,
-            strand=Strand(fields[6]),
-            phase=phase,
-            attributes=attributes,
-        )
-
-    def slice(self, zero_based: bool = True) -> Tuple[int, int]:
-        """Get a tuple for slicing a python object.
-        The reason this method is required is that GFF uses 1-based INCLUSIVE
-        coordinates. Meaning the end position is also included in the slice.
-        """
-        if zero_based:
-            return self.start - 1, self.end
-        return self.start, self.end + 1
+
+def _extract(attr_col: str, key: str) -> Optional[str]:
+    """Get the value of key from a GFF attributes column by scanning for it, rather
+    than splitting every attribute into a dict.
+    """
+    prefix = f"{key}="
+    if attr_col.startswith(prefix):
+        i = len(prefix)
+    else:
+        i = attr_col.find(f";{prefix}")
+        if i < 0:
+            return None
+        i += len(prefix) + 1
+    j = attr_col.find(";", i)
+    return attr_col[i:j] if j >= 0 else attr_col[i:]
 
 
 class DuplicateContigsError(Exception):
@@ -78,103 +69,372 @@ class NoDataError(Exception):
     pass
 
 
-def is_header(s: str) -> bool:
-    if not s:
-        return False
-    return s[0] == ">"
-
+class FaidxSeq:
+    """A contig of a FASTA file with a samtools faidx index. Slicing it reads just that
+    region of the file, so the contig's sequence is never held in memory.
+    """
 
-def index_fasta(stream: TextIO) -> Index:
-    fasta_index: Index = dict()
-    sequence: List[Seq] = []
-    name: Contig = ""
-    for line in map(str.rstrip, stream):
-        if not line:
-            continue
-        if is_header(line):
-            if sequence and name:
-                fasta_index[name] = "".join(sequence)
-                sequence = []
-            name = line.split()[0][1:]
-            if name in fasta_index:
+    _open_lock = threading.Lock()
+
+    def __init__(
+        self, path: str, length: int, offset: int, line_bases: int, line_width: int
+    ):
+        self.path = path
+        self.length = length
+        self.offset = offset
+        self.line_bases = line_bases
+        self.line_width = line_width
+        self._fd: Optional[int] = None
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, key: slice) -> bytes:
+        begin, end, _ = key.indices(self.length)
+        if begin >= end:
+            return b""
+        start = self._file_pos(begin)
+        stop = self._file_pos(end - 1) + 1
+        if self._fd is None:
+            # a contig's chunks are read by several writer threads, so only one of
+            # them opens the file
+            with self._open_lock:
+                if self._fd is None:
+                    self._fd = os.open(self.path, os.O_RDONLY)
+        return os.pread(self._fd, stop - start, start).translate(None, WHITESPACE)
+
+    def __getstate__(self) -> dict:
+        # file descriptors don't survive pickling, so a copy opens its own
+        state = self.__dict__.copy()
+        state["_fd"] = None
+        return state
+
+    def __del__(self):
+        if self._fd is not None:
+            os.close(self._fd)
+
+    def _file_pos(self, pos: int) -> int:
+        line, col = divmod(pos, self.line_bases)
+        return self.offset + line * self.line_width + col
+
+
+def load_faidx(path: str) -> Index:
+    """Index a FASTA file from its samtools faidx index (<path>.fai) without reading
+    any sequence.
+    """
+    index: Index = dict()
+    with open(f"{path}.fai") as fai:
+        for line in fai:
+            name, length, offset, line_bases, line_width = line.split("\t")[:5]
+            if name in index:
                 raise DuplicateContigsError(
                     f"Contig {name} occurs multiple times in the fasta file."
                 )
-            continue
+            index[name] = FaidxSeq(
+                path, int(length), int(offset), int(line_bases), int(line_width)
+            )
+    return index
+
+
+def index_fasta(path: str) -> Index:
+    """Index a FASTA file by reading it into a single buffer and scanning for headers,
+    so the newlines are stripped from each contig's sequence in one pass rather than
+    line by line. The size of a regular file is known, so its buffer is allocated up
+    front and read into directly. Anything else (stdin, gzip, a pipe) is read in
+    chunks.
+    """
+    if path == "-":
+        return index_fasta_buffer(read_stream(sys.stdin.buffer))
+    if path.endswith(".gz"):
+        with gzip.open(path) as fh:
+            return index_fasta_buffer(read_stream(fh))
+
+    with open(path, "rb", buffering=0) as fh:
+        st = os.fstat(fh.fileno())
+        if not stat.S_ISREG(st.st_mode):
+            # e.g. a FIFO or process substitution, which report a size of 0
+            return index_fasta_buffer(read_stream(fh))
+        buf = bytearray(st.st_size)
+        view = memoryview(buf)
+        num_read = 0
+        while num_read < len(buf):
+            chunk_size = fh.readinto(view[num_read:])
+            if not chunk_size:
+                break
+            num_read += chunk_size
+        view.release()
+        del buf[num_read:]
+    return index_fasta_buffer(buf)
+
+
+def read_stream(stream: BinaryIO, chunk_size: int = 1 << 20) -> bytearray:
+    buf = bytearray()
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return buf
+        buf += chunk
+
+
+def index_fasta_buffer(buf: bytearray, block_size: int = 1 << 20) -> Index:
+    """Each contig's sequence is compacted in place towards the front of buf as it is
+    found, with its whitespace removed, and the index holds views into buf. The
+    compaction goes block_size bytes at a time, so beyond buf only a block's worth of
+    memory is used, however long the contig.
+    """
+    spans: Dict[Contig, Tuple[int, int]] = dict()
+    size = len(buf)
+    write_pos = 0
+    if buf[:1] == b">":
+        header_start = 0
+    else:
+        header_start = buf.find(b"\n>")
+        if header_start >= 0:
+            header_start += 1
+
+    while header_start >= 0:
+        header_end = buf.find(b"\n", header_start)
+        if header_end < 0:
+            header_end = size
+        next_header = buf.find(b"\n>", header_end)
+        seq_end = size if next_header < 0 else next_header
+
+        name = buf[header_start:header_end].split()[0][1:].decode()
+        if name in spans:
+            raise DuplicateContigsError(
+                f"Contig {name} occurs multiple times in the fasta file."
+            )
+        seq_start = write_pos
+        for pos in range(header_end, seq_end, block_size):
+            block = buf[pos : min(pos + block_size, seq_end)].translate(
+                None, WHITESPACE
+            )
+            # write_pos never passes pos, so nothing still to be compacted is lost
+            buf[write_pos : write_pos + len(block)] = block
+            write_pos += len(block)
+        if name and write_pos > seq_start:
+            spans[name] = (seq_start, write_pos)
         else:
-            sequence.append(line)
-    if name and sequence:
-        fasta_index[name] = "".join(sequence)
+            write_pos = seq_start
+
+        header_start = next_header if next_header < 0 else next_header + 1
 
-    return fasta_index
+    del buf[write_pos:]
+    view = memoryview(buf)
+    return {name: view[start:end] for name, (start, end) in spans.items()}
 
 
 def data_reducer(current_reduced_data: str, new_data: str) -> str:
-    """This function is used when merging overlaps in the features index tree. By
-    default, when merging overlaps, the data is removed. However, in this script we
-    need the interval data as it hold the name of the interval. Therefore, this function
-    tells intervalltree how to merge the data field in intervals.
+    """This function is used when merging overlapping intervals. By default, when
+    merging overlaps, the data is removed. However, in this script we need the interval
+    data as it hold the name of the interval. Therefore, this function tells
+    merge_overlaps how to merge the data field in intervals.
     """
     return f"{current_reduced_data}+{new_data}"
 
 
-def slice_seq(seq: Seq, interval: Interval) -> Seq:
+def merge_overlaps(intervals: Iterable[Interval]) -> List[Interval]:
+    """Merge overlapping intervals, combining their data with data_reducer. Intervals
+    that only touch end-to-end are not merged. Duplicate intervals are dropped and
+    the rest merged in a single sweep over the sorted intervals.
+    """
+    merged: List[Interval] = []
+    for iv in sorted(set(intervals)):
+        if merged and iv.begin < merged[-1].end:
+            lower = merged[-1]
+            merged[-1] = Interval(
+                lower.begin, max(lower.end, iv.end), data_reducer(lower.data, iv.data)
+            )
+        else:
+            merged.append(iv)
+    return merged
+
+
+def infer_igrs(features: List[Interval], contig_len: int) -> List[Interval]:
+    """Find the gaps between sorted, non-overlapping features on a contig in one pass.
+    The gaps are the intergenic regions (IGRs) and span from position 1 to the end
+    of the contig, excluding the features.
+    """
+    igrs: List[Interval] = []
+    prev_end = 1
+    for iv in features:
+        if iv.begin >= contig_len:
+            break
+        if iv.begin > prev_end:
+            igrs.append(Interval(prev_end, iv.begin, data=f"IGR:{prev_end}-{iv.begin}"))
+        prev_end = max(prev_end, iv.end)
+
+    if prev_end < contig_len:
+        igrs.append(Interval(prev_end, contig_len, data=f"IGR:{prev_end}-{contig_len}"))
+    return igrs
+
+
+def slice_seq(seq: Seq, interval: Interval) -> Union[memoryview, bytes]:
+    """The interval's sequence. For an in-memory contig this is a view, so no copy of
+    it is made before writing.
+    """
     i = interval.begin
     j = interval.end
     return seq[i:j]
 
 
-def construct_feature_trees(
-    gff: TextIO, types: Tuple[str]
-) -> Dict[Contig, IntervalTree]:
-    feature_trees: Dict[Contig, IntervalTree] = defaultdict(IntervalTree)
+def parse_gff_features(
+    gff: BinaryIO, types: Iterable[str]
+) -> Iterator[Tuple[Contig, Interval]]:
+    """Parse the features of the given types from a GFF3 file as (seqid, interval)
+    pairs, with 0-based interval coordinates. Lines are rejected on their raw type
+    column, and only the columns an interval needs are converted, so as little work
+    as possible is done per line.
+    """
+    wanted_types = frozenset(t.encode() for t in types)
 
-    for line in map(str.rstrip, gff):
-        if not line or line.startswith("#"):
+    for line in gff:
+        if line.startswith(b"#"):
             continue
-
-        feature = GffFeature.from_str(line)
-        if feature.method not in types:
+        fields = line.rstrip().split(b"\t", 8)
+        if len(fields) < 9 or fields[2] not in wanted_types:
             continue
 
-        start, end = feature.slice(zero_based=True)
+        start = int(fields[3]) - 1
+        end = int(fields[4])
+        attributes = fields[8].decode()
 
-        if "Name" in feature.attributes:
-            name = feature.attributes["Name"]
-        elif "ID" in feature.attributes:
-            name = feature.attributes["ID"]
-        else:
-            name = f"{feature.method};{start}-{end}"
+        name = _extract(attributes, "Name")
+        if name is None:
+            name = _extract(attributes, "ID")
+        if name is None:
+            name = f"{fields[2].decode()};{start}-{end}"
             logging.warning(
-                f"Can't find a Name or ID for feature {feature}. Using {name}"
+                f"Can't find a Name or ID for feature {line.rstrip().decode()}. "
+                f"Using {name}"
             )
 
-        iv = Interval(start, end, data=name)
-        feature_trees[feature.seqid].add(iv)
-    return feature_trees
+        yield fields[0].decode(), Interval(start, end, data=name)
+
+
+def construct_feature_intervals(
+    gff: BinaryIO, types: Tuple[str]
+) -> Dict[Contig, List[Interval]]:
+    intervals: Dict[Contig, List[Interval]] = defaultdict(list)
+    for seqid, interval in parse_gff_features(gff, types):
+        intervals[seqid].append(interval)
+    return intervals
 
 
-def merge_short_intervals(tree: IntervalTree, min_len: int = 1) -> IntervalTree:
+def merge_short_intervals(
+    intervals: Iterable[Interval], min_len: int = 1
+) -> List[Interval]:
     """Merge short intervals with their neighbour.
-    It is expected that there are no gaps between intervals.
+    It is expected that there are no gaps between intervals. The intervals are kept
+    as a sorted list, so each round of merging is a sweep with merge_overlaps and
+    nothing is done at all when there are no short intervals.
     """
-    intervals: List[Interval] = []
-    for i, iv in enumerate(sorted(tree)):
-        if iv.length() >= min_len:
-            intervals.append(iv)
-            continue
-        if not intervals:
-            intervals.append(Interval(iv.begin, iv.end + 1, data=iv.data))
-        else:
-            intervals.append(Interval(iv.begin - 1, iv.end, data=iv.data))
+    intervals = sorted(intervals)
+    if all(iv.length() >= min_len for iv in intervals):
+        return intervals
+
+    while True:
+        extended: List[Interval] = []
+        for iv in intervals:
+            if iv.length() >= min_len:
+                extended.append(iv)
+            elif not extended:
+                extended.append(Interval(iv.begin, iv.end + 1, data=iv.data))
+            else:
+                extended.append(Interval(iv.begin - 1, iv.end, data=iv.data))
+        intervals = merge_overlaps(extended)
+
+        if len(intervals) <= 1 or all(iv.length() >= min_len for iv in intervals):
+            return intervals
+
+
+def split_contig(
+    contig: Contig,
+    seq: Seq,
+    features: List[Interval],
+    contig_dir: str,
+    min_len: int,
+    max_len: float,
+    write_threads: int = 1,
+) -> List[str]:
+    """Split a contig into its (merged) features and the IGRs between them, writing
+    each chunk to a FASTA file in contig_dir with write_threads threads. Returns the
+    mapping file rows for the chunks. Contigs don't depend on each other, so they can
+    be split in parallel.
+    """
+    logging.info(f"Inferring intergenic region interval(s) for {contig}...")
+    igrs = infer_igrs(features, len(seq))
+    logging.info(f"Found {len(igrs)} intergenic region interval(s) for {contig}")
+
+    logging.info(f"Merging short intervals for {contig}...")
+    chunks = merge_short_intervals(igrs + features, min_len=min_len)
+    logging.info(f"{len(chunks)} interval(s) after merging short ones.")
+
+    logging.info(f"Writing output file(s) for {contig}...")
+    mapping_rows: List[str] = []
+    # plain string concatenation rather than Path objects, as paths are built per chunk
+    dir_prefix = os.path.join(contig_dir, "")
+    # the writes are I/O bound, so extra threads spend most of their time outside the
+    # GIL. A single writer thread gains nothing from a pool, so it writes inline
+    executor = ThreadPoolExecutor(write_threads) if write_threads > 1 else None
+    # only a few writes are queued at a time, so the pending futures (and, with
+    # --faidx, the chunks read for them) don't build up for a large contig
+    writes: Deque[Future] = deque()
+    try:
+        for interval in chunks:
+            if interval.length() > max_len:
+                logging.info(
+                    f"Interval {interval.data} ({interval.length()}bp) is longer than "
+                    f"the maximum allowed length. Skipping..."
+                )
+                continue
 
-    tree = IntervalTree(intervals)
-    tree.merge_overlaps(data_reducer=data_reducer)
+            filename = interval.data + ".fa"
+            filepath = dir_prefix + filename
+            header = (
+                f">{interval.data} contig={contig}|start={interval.begin}|"
+                f"end={interval.end}"
+            )
+            if executor is None:
+                write_chunk(filepath, header, seq, interval)
+            else:
+                if len(writes) >= 2 * write_threads:
+                    writes.popleft().result()
+                writes.append(
+                    executor.submit(write_chunk, filepath, header, seq, interval)
+                )
 
-    if any(iv.length() < min_len for iv in tree) and len(tree) > 1:
-        return merge_short_intervals(tree, min_len=min_len)
-    else:
-        return tree
+            interval_type = infer_interval_type(interval)
+            mapping_rows.append(
+                f"{contig}/{filename},{interval_type},{interval.begin},"
+                f"{interval.end},{interval.data},{contig}\n"
+            )
+
+        # surface any error from the remaining writes
+        while writes:
+            writes.popleft().result()
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return mapping_rows
+
+
+def write_chunk(filepath: str, header: str, seq: Seq, interval: Interval):
+    # the chunk is sliced by the writer, so with --faidx it is read from the file
+    # just before it is written rather than queued up in memory
+    chunk_seq = slice_seq(seq, interval)
+    try:
+        # exclusive mode checks the file doesn't exist as part of opening it
+        with open(filepath, "xb") as fa_stream:
+            fa_stream.write(header.encode())
+            fa_stream.write(b"\n")
+            fa_stream.write(chunk_seq)
+    except FileExistsError as err:
+        raise FileExistsError(
+            f"A file already exists for {interval} at {filepath}"
+        ) from err
+    logging.debug(f"{interval} written to {filepath}")
 
 
 def infer_interval_type(interval: Interval) -> str:
@@ -197,8 +457,8 @@ def infer_interval_type(interval: Interval) -> str:
 @click.option(
     "-f",
     "--fasta",
-    help="FASTA file to split.",
-    type=click.File(mode="r"),
+    help="FASTA file to split. May be gzipped.",
+    type=click.Path(exists=True, dir_okay=False, allow_dash=True),
     default="-",
     show_default=True,
     required=True,
@@ -207,7 +467,7 @@ def infer_interval_type(interval: Interval) -> str:
     "-g",
     "--gff",
     help="GFF3 file to base split coordinates on.",
-    type=click.File(mode="r"),
+    type=click.File(mode="rb"),
     required=True,
 )
 @click.option(
@@ -249,14 +509,36 @@ def infer_interval_type(interval: Interval) -> str:
     default=float("inf"),
     show_default=True,
 )
+@click.option(
+    "--faidx",
+    help=(
+        "Read the chunks' sequences straight from the FASTA file using its samtools "
+        "faidx index (<FASTA>.fai), instead of loading the whole genome into memory. "
+        "The FASTA must be an uncompressed file."
+    ),
+    is_flag=True,
+)
+@click.option(
+    "-t",
+    "--threads",
+    help=(
+        "Number of threads to use. Contigs are split in parallel processes and the "
+        "threads left over are used to write each contig's chunks."
+    ),
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+)
 @click.option("-v", "--verbose", help="Turns on debug-level logging.", is_flag=True)
 def main(
-    fasta: TextIO,
-    gff: TextIO,
+    fasta: str,
+    gff: BinaryIO,
     outdir: str,
     types: Tuple[str],
     min_len: int,
     max_len: float,
+    faidx: bool,
+    threads: int,
     verbose: bool,
 ):
     """Splits a FASTA file into chunks based on a GFF3 file.
@@ -271,103 +553,89 @@ def main(
         format="%(asctime)s [%(levelname)s]: %(message)s", level=log_level
     )
 
-    logging.info("Indexing fasta file...")
-    index: Index = index_fasta(fasta)
+    if faidx:
+        if fasta == "-" or fasta.endswith(".gz"):
+            raise click.BadParameter(
+                "--faidx needs an uncompressed FASTA file", param_hint="--fasta"
+            )
+        if not os.path.exists(f"{fasta}.fai"):
+            raise click.BadParameter(
+                f"--faidx needs an index at {fasta}.fai (see samtools faidx)",
+                param_hint="--fasta",
+            )
+        logging.info("Loading fasta index...")
+        index: Index = load_faidx(fasta)
+    else:
+        logging.info("Indexing fasta file...")
+        index = index_fasta(fasta)
     logging.info(f"{len(index)} contig(s) indexed in the input file.")
 
-    index_trees: Dict[Contig, IntervalTree] = {
-        contig: IntervalTree([Interval(1, len(seq))]) for contig, seq in index.items()
-    }
-
-    logging.info("Constructing interval tree for features...")
-    feature_trees: Dict[Contig, IntervalTree] = construct_feature_trees(gff, types)
+    logging.info("Constructing intervals for features...")
+    features: Dict[Contig, List[Interval]] = construct_feature_intervals(gff, types)
 
-    for contig in feature_trees:
+    for contig, intervals in features.items():
         logging.info(f"Merging overlapping features for {contig}...")
-        feature_trees[contig].merge_overlaps(data_reducer=data_reducer)
+        features[contig] = merge_overlaps(intervals)
 
-    for contig, tree in feature_trees.items():
-        logging.info(f"Found {len(tree)} feature(s) for {contig}")
+    for contig, intervals in features.items():
+        logging.info(f"Found {len(intervals)} feature(s) for {contig}")
 
-    for contig in index_trees:
-        logging.info(f"Inferring intergenic region interval(s) for {contig}...")
-        for iv in feature_trees[contig]:
-            index_trees[contig].chop(iv.begin, iv.end)
-
-        intervals_with_names = set()
-        for iv in index_trees[contig]:
-            name = f"IGR:{iv.begin}-{iv.end}"
-            intervals_with_names.add(Interval(iv.begin, iv.end, data=name))
-
-        index_trees[contig] = IntervalTree(intervals_with_names)
-
-        logging.info(
-            f"Found {len(index_trees[contig])} intergenic region interval(s) for "
-            f"{contig}"
-        )
-
-    logging.debug("Joining IGR and feature trees...")
-    trees = {
-        contig: index_trees[contig].union(feature_trees[contig])
-        for contig in feature_trees
-    }
-    for contig, tree in trees.items():
-        logging.info(f"Merging short intervals for {contig}...")
-        trees[contig] = merge_short_intervals(tree, min_len=min_len)
-        logging.info(f"{len(trees[contig])} interval(s) after merging short ones.")
+    # contigs with features come first, in the order they appear in the GFF
+    contigs = list(features) + [contig for contig in index if contig not in features]
 
     outdir = Path(outdir)
     outdir.mkdir(parents=True, exist_ok=True)
     file_mapping_path = outdir / "loci-info.csv"
-    mapping_stream = file_mapping_path.open("w")
-    print(
-        ",".join(["filename", "type", "start", "end", "name", "contig"]),
-        file=mapping_stream,
-    )
-
-    for contig, tree in trees.items():
-        logging.info(f"Writing output file(s) for {contig}...")
-        for interval in tree:
-            if interval.length() > max_len:
-                logging.info(
-                    f"Interval {interval.data} ({interval.length()}bp) is longer than "
-                    f"the maximum allowed length. Skipping..."
-                )
-                continue
+    mapping_stream = file_mapping_path.open("w", buffering=1 << 20)  # 1MiB
+    mapping_stream.write("filename,type,start,end,name,contig\n")
 
-            contig_dir = outdir / contig
-            contig_dir.mkdir(parents=True, exist_ok=True)
-            filepath = contig_dir / f"{interval.data}.fa"
-            if filepath.exists():
-                raise FileExistsError(
-                    f"A file already exists for {interval} at {filepath}"
+    contig_dirs: Dict[Contig, str] = {
+        contig: os.path.join(outdir, contig) for contig in contigs
+    }
+    for contig_dir in contig_dirs.values():
+        os.makedirs(contig_dir, exist_ok=True)
+
+    processes = min(threads, len(contigs)) or 1
+    write_threads = max(1, min(MAX_WRITE_THREADS, threads // processes))
+
+    if processes > 1:
+        logging.info(f"Splitting {len(contigs)} contigs with {processes} processes...")
+        with Pool(processes=processes) as pool:
+            # only a few contigs are handed to the workers at a time, as each is sent a
+            # copy of its sequence (memoryviews can't be pickled). Results are taken in
+            # the order the contigs were submitted, which keeps the mapping rows in
+            # contig order, and a worker's error is raised here
+            pending: Deque[AsyncResult] = deque()
+            for contig in contigs:
+                if len(pending) >= 2 * processes:
+                    mapping_stream.writelines(pending.popleft().get())
+                seq = index[contig]
+                if isinstance(seq, memoryview):
+                    seq = bytes(seq)
+                task = (
+                    contig,
+                    seq,
+                    features[contig],
+                    contig_dirs[contig],
+                    min_len,
+                    max_len,
+                    write_threads,
                 )
-            header = (
-                f">{interval.data} contig={contig}|start={interval.begin}|"
-                f"end={interval.end}"
-            )
-            seq = slice_seq(index[contig], interval)
-            filepath.write_text(f"{header}\n{seq}")
-
-            interval_type = infer_interval_type(interval)
-            print(
-                ",".join(
-                    map(
-                        str,
-                        [
-                            "/".join(filepath.parts[-2:]),
-                            interval_type,
-                            interval.begin,
-                            interval.end,
-                            interval.data,
-                            contig,
-                        ],
-                    )
-                ),
-                file=mapping_stream,
+                pending.append(pool.apply_async(split_contig, task))
+            while pending:
+                mapping_stream.writelines(pending.popleft().get())
+    else:
+        for contig in contigs:
+            mapping_rows = split_contig(
+                contig,
+                index[contig],
+                features[contig],
+                contig_dirs[contig],
+                min_len,
+                max_len,
+                write_threads,
             )
-
-            logging.debug(f"{interval} written to {filepath}")
+            mapping_stream.writelines(mapping_rows)
 
     mapping_stream.close()
     logging.info(f"File mapping written to {file_mapping_path}")
@@ -0,0 +1,495 @@
+import gzip
+import os
+import pickle
+import threading
+from io import BytesIO
+
+import pytest
+from click.testing import CliRunner
+from gff_splitter import (
+    Interval,
+    DuplicateContigsError,
+    _extract,
+    index_fasta,
+    index_fasta_buffer,
+    infer_igrs,
+    infer_interval_type,
+    load_faidx,
+    main,
+    merge_overlaps,
+    merge_short_intervals,
+    parse_gff_features,
+    split_contig,
+    write_chunk,
+)
+
+
+def as_bytes(index) -> dict:
+    return {name: bytes(seq) for name, seq in index.items()}
+
+
+def read_outdir(outdir) -> dict:
+    return {
+        str(path.relative_to(outdir)): path.read_bytes()
+        for path in sorted(outdir.rglob("*"))
+        if path.is_file()
+    }
+
+
+class TestMergeOverlaps:
+    def test_noIntervals_returnsEmpty(self):
+        assert merge_overlaps([]) == []
+
+    def test_touchingIntervals_notMerged(self):
+        intervals = [Interval(5, 10, "b"), Interval(0, 5, "a")]
+
+        actual = merge_overlaps(intervals)
+        expected = [Interval(0, 5, "a"), Interval(5, 10, "b")]
+
+        assert actual == expected
+
+    def test_overlappingIntervals_mergedWithData(self):
+        intervals = [Interval(0, 6, "a"), Interval(5, 10, "b")]
+
+        actual = merge_overlaps(intervals)
+        expected = [Interval(0, 10, "a+b")]
+
+        assert actual == expected
+
+    def test_containedInterval_keepsOuterEnd(self):
+        intervals = [Interval(0, 10, "a"), Interval(2, 4, "b"), Interval(8, 12, "c")]
+
+        actual = merge_overlaps(intervals)
+        expected = [Interval(0, 12, "a+b+c")]
+
+        assert actual == expected
+
+    def test_duplicateIntervals_onlyOneKept(self):
+        intervals = [Interval(0, 5, "a"), Interval(0, 5, "a"), Interval(7, 9, "b")]
+
+        actual = merge_overlaps(intervals)
+        expected = [Interval(0, 5, "a"), Interval(7, 9, "b")]
+
+        assert actual == expected
+
+
+class TestInferIgrs:
+    def test_noFeatures_wholeContigFromOne(self):
+        actual = infer_igrs([], 30)
+        expected = [Interval(1, 30, "IGR:1-30")]
+
+        assert actual == expected
+
+    def test_featureAtStart_noLeadingIgr(self):
+        actual = infer_igrs([Interval(0, 10, "g")], 30)
+        expected = [Interval(10, 30, "IGR:10-30")]
+
+        assert actual == expected
+
+    def test_featuresInMiddle_igrsBetweenAndAtTail(self):
+        features = [Interval(5, 10, "g"), Interval(20, 25, "h")]
+
+        actual = infer_igrs(features, 30)
+        expected = [
+            Interval(1, 5, "IGR:1-5"),
+            Interval(10, 20, "IGR:10-20"),
+            Interval(25, 30, "IGR:25-30"),
+        ]
+
+        assert actual == expected
+
+    def test_featureEndsAtContigEnd_noTailIgr(self):
+        actual = infer_igrs([Interval(5, 30, "g")], 30)
+        expected = [Interval(1, 5, "IGR:1-5")]
+
+        assert actual == expected
+
+    def test_featurePastContigEnd_ignored(self):
+        features = [Interval(5, 10, "g"), Interval(30, 40, "h")]
+
+        actual = infer_igrs(features, 30)
+        expected = [Interval(1, 5, "IGR:1-5"), Interval(10, 30, "IGR:10-30")]
+
+        assert actual == expected
+
+    def test_featureOverhangsContigEnd_noTailIgr(self):
+        actual = infer_igrs([Interval(25, 40, "g")], 30)
+        expected = [Interval(1, 25, "IGR:1-25")]
+
+        assert actual == expected
+
+
+class TestMergeShortIntervals:
+    def test_minLenOne_sortedAndUnchanged(self):
+        intervals = [Interval(5, 6, "b"), Interval(0, 5, "a")]
+
+        actual = merge_short_intervals(intervals)
+        expected = [Interval(0, 5, "a"), Interval(5, 6, "b")]
+
+        assert actual == expected
+
+    def test_shortInterval_mergedWithPrevious(self):
+        intervals = [Interval(0, 5, "a"), Interval(5, 6, "b"), Interval(6, 20, "c")]
+
+        actual = merge_short_intervals(intervals, min_len=3)
+        expected = [Interval(0, 6, "a+b"), Interval(6, 20, "c")]
+
+        assert actual == expected
+
+    def test_shortFirstInterval_mergedWithNext(self):
+        intervals = [Interval(0, 2, "a"), Interval(2, 20, "b")]
+
+        actual = merge_short_intervals(intervals, min_len=3)
+        expected = [Interval(0, 20, "a+b")]
+
+        assert actual == expected
+
+    def test_singleShortInterval_extended(self):
+        actual = merge_short_intervals([Interval(0, 2, "a")], min_len=3)
+        expected = [Interval(0, 3, "a")]
+
+        assert actual == expected
+
+
+class TestExtract:
+    def test_keyAtStart_returnsValue(self):
+        assert _extract("Name=dnaA;ID=Rv0001", "Name") == "dnaA"
+
+    def test_keyIsLast_returnsValue(self):
+        assert _extract("ID=Rv0001;Name=dnaA", "Name") == "dnaA"
+
+    def test_keyIsSuffixOfAnotherKey_notMatched(self):
+        assert _extract("AltName=foo;Note=bar", "Name") is None
+
+    def test_keyAfterSimilarKey_returnsValue(self):
+        assert _extract("AltName=foo;Name=bar", "Name") == "bar"
+
+    def test_keyMissing_returnsNone(self):
+        assert _extract("ID=Rv0001", "Name") is None
+
+
+class TestParseGffFeatures:
+    def test_featuresOfOtherTypesAndCommentsSkipped(self):
+        gff = BytesIO(
+            b"##gff-version 3\n"
+            b"c1\tsrc\tgene\t1\t10\t.\t+\t.\tName=g1\n"
+            b"c1\tsrc\tCDS\t1\t10\t.\t+\t0\tName=cds1\n"
+            b"\n"
+        )
+
+        actual = list(parse_gff_features(gff, ["gene"]))
+        expected = [("c1", Interval(0, 10, "g1"))]
+
+        assert actual == expected
+
+    def test_noName_usesId(self):
+        gff = BytesIO(b"c1\tsrc\tgene\t5\t8\t.\t-\t.\tID=Rv1;AltName=x\n")
+
+        actual = list(parse_gff_features(gff, ["gene"]))
+        expected = [("c1", Interval(4, 8, "Rv1"))]
+
+        assert actual == expected
+
+    def test_noNameOrId_usesTypeAndCoords(self):
+        gff = BytesIO(b"c1\tsrc\tgene\t5\t8\t.\t-\t.\tNote=x\r\n")
+
+        actual = list(parse_gff_features(gff, ["gene"]))
+        expected = [("c1", Interval(4, 8, "gene;4-8"))]
+
+        assert actual == expected
+
+
+class TestIndexFastaBuffer:
+    def test_emptyBuffer_returnsEmpty(self):
+        assert index_fasta_buffer(bytearray()) == {}
+
+    def test_multiLineContigs_newlinesRemoved(self):
+        buf = bytearray(b">a desc\nAC\nGT\n>b\nTT\n")
+
+        actual = as_bytes(index_fasta_buffer(buf))
+        expected = {"a": b"ACGT", "b": b"TT"}
+
+        assert actual == expected
+
+    def test_leadingBlankLine_ignored(self):
+        buf = bytearray(b"\n>a\nAC\n")
+
+        actual = as_bytes(index_fasta_buffer(buf))
+        expected = {"a": b"AC"}
+
+        assert actual == expected
+
+    def test_leadingBlankLines_ignored(self):
+        buf = bytearray(b"\n\n>a\nAC\n")
+
+        actual = as_bytes(index_fasta_buffer(buf))
+        expected = {"a": b"AC"}
+
+        assert actual == expected
+
+    def test_crlfLineEndings_removed(self):
+        buf = bytearray(b">a\r\nAC\r\nGT\r\n>b\r\nTT")
+
+        actual = as_bytes(index_fasta_buffer(buf))
+        expected = {"a": b"ACGT", "b": b"TT"}
+
+        assert actual == expected
+
+    def test_emptyContig_notIndexed(self):
+        buf = bytearray(b">a\n>b\nTT\n")
+
+        actual = as_bytes(index_fasta_buffer(buf))
+        expected = {"b": b"TT"}
+
+        assert actual == expected
+
+    @pytest.mark.parametrize("block_size", [1, 2, 3, 7])
+    def test_compactedInSmallBlocks(self, block_size):
+        buf = bytearray(b">a\r\nACGTA\r\nCG\r\n>b x\nTTG\nCA\n>c\n\n>d\nG")
+
+        actual = as_bytes(index_fasta_buffer(buf, block_size=block_size))
+        expected = {"a": b"ACGTACG", "b": b"TTGCA", "d": b"G"}
+
+        assert actual == expected
+
+    def test_duplicateContigs_raisesError(self):
+        buf = bytearray(b">a\nAC\n>a\nGT\n")
+
+        with pytest.raises(DuplicateContigsError):
+            index_fasta_buffer(buf)
+
+
+class TestIndexFasta:
+    def test_regularFile(self, tmp_path):
+        path = tmp_path / "g.fa"
+        path.write_bytes(b">a\nAC\nGT\n>b\nTT\n")
+
+        actual = as_bytes(index_fasta(str(path)))
+        expected = {"a": b"ACGT", "b": b"TT"}
+
+        assert actual == expected
+
+    def test_gzippedFile(self, tmp_path):
+        path = tmp_path / "g.fa.gz"
+        with gzip.open(path, "wb") as fh:
+            fh.write(b">a\nAC\nGT\n")
+
+        actual = as_bytes(index_fasta(str(path)))
+        expected = {"a": b"ACGT"}
+
+        assert actual == expected
+
+    def test_fifo_readAsStream(self, tmp_path):
+        path = tmp_path / "g.fifo"
+        os.mkfifo(path)
+
+        def write():
+            with open(path, "wb") as fh:
+                fh.write(b">a\nAC\nGT\n")
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        actual = as_bytes(index_fasta(str(path)))
+        writer.join()
+        expected = {"a": b"ACGT"}
+
+        assert actual == expected
+
+
+class TestFaidxSeq:
+    @pytest.fixture
+    def index(self, tmp_path):
+        path = tmp_path / "g.fa"
+        # 4 bases per line, with the newline making lines 5 bytes wide
+        path.write_bytes(b">a\nACGT\nTTGG\nCA\n>b\nGGCC\n")
+        fai = tmp_path / "g.fa.fai"
+        fai.write_text("a\t10\t3\t4\t5\nb\t4\t19\t4\t5\n")
+        return load_faidx(str(path))
+
+    def test_sliceWithinLine(self, index):
+        assert index["a"][1:3] == b"CG"
+
+    def test_sliceCrossesLines(self, index):
+        assert index["a"][2:9] == b"GTTTGGC"
+
+    def test_wholeContig(self, index):
+        assert index["a"][0 : len(index["a"])] == b"ACGTTTGGCA"
+        assert index["b"][0:4] == b"GGCC"
+
+    def test_sliceEndsOnLineEnd(self, index):
+        assert index["a"][4:8] == b"TTGG"
+
+    def test_emptySlice(self, index):
+        assert index["a"][5:5] == b""
+
+    def test_sliceClampedToContigLength(self, index):
+        assert index["a"][8:20] == b"CA"
+
+    def test_duplicateContigs_raisesError(self, tmp_path):
+        path = tmp_path / "g.fa"
+        path.write_bytes(b">a\nAC\n")
+        (tmp_path / "g.fa.fai").write_text("a\t2\t3\t2\t3\na\t2\t3\t2\t3\n")
+
+        with pytest.raises(DuplicateContigsError):
+            load_faidx(str(path))
+
+    def test_isPicklable(self, index):
+        index["a"][0:1]  # opens the file
+        copy = pickle.loads(pickle.dumps(index["a"]))
+
+        assert copy[2:9] == b"GTTTGGC"
+
+
+class TestSplitContig:
+    seq = memoryview(b"ACGTACGTACGTACGTACGT")
+    features = [Interval(4, 8, "g1"), Interval(12, 18, "g2")]
+
+    @pytest.mark.parametrize("write_threads", [1, 3])
+    def test_mappingRowsInContigOrder(self, tmp_path, write_threads):
+        actual = split_contig(
+            "c1", self.seq, self.features, str(tmp_path), 1, float("inf"), write_threads
+        )
+        expected = [
+            "c1/IGR:1-4.fa,igr,1,4,IGR:1-4,c1\n",
+            "c1/g1.fa,feature,4,8,g1,c1\n",
+            "c1/IGR:8-12.fa,igr,8,12,IGR:8-12,c1\n",
+            "c1/g2.fa,feature,12,18,g2,c1\n",
+            "c1/IGR:18-20.fa,igr,18,20,IGR:18-20,c1\n",
+        ]
+
+        assert actual == expected
+
+    @pytest.mark.parametrize("write_threads", [1, 3])
+    def test_chunksWritten(self, tmp_path, write_threads):
+        split_contig(
+            "c1", self.seq, self.features, str(tmp_path), 1, float("inf"), write_threads
+        )
+
+        actual = read_outdir(tmp_path)
+        expected = {
+            "IGR:1-4.fa": b">IGR:1-4 contig=c1|start=1|end=4\nCGT",
+            "g1.fa": b">g1 contig=c1|start=4|end=8\nACGT",
+            "IGR:8-12.fa": b">IGR:8-12 contig=c1|start=8|end=12\nACGT",
+            "g2.fa": b">g2 contig=c1|start=12|end=18\nACGTAC",
+            "IGR:18-20.fa": b">IGR:18-20 contig=c1|start=18|end=20\nGT",
+        }
+
+        assert actual == expected
+
+    def test_chunkLongerThanMaxLen_skipped(self, tmp_path):
+        actual = split_contig("c1", self.seq, self.features, str(tmp_path), 1, 5)
+
+        assert "c1/g2.fa,feature,12,18,g2,c1\n" not in actual
+        assert len(actual) == 4
+        assert not (tmp_path / "g2.fa").exists()
+
+    @pytest.mark.parametrize("write_threads", [1, 3])
+    def test_chunkFileExists_raisesError(self, tmp_path, write_threads):
+        (tmp_path / "g2.fa").write_bytes(b"")
+
+        with pytest.raises(FileExistsError):
+            split_contig(
+                "c1",
+                self.seq,
+                self.features,
+                str(tmp_path),
+                1,
+                float("inf"),
+                write_threads,
+            )
+
+
+class TestWriteChunk:
+    def test_writesHeaderAndIntervalSeq(self, tmp_path):
+        path = tmp_path / "g.fa"
+
+        write_chunk(str(path), ">g", memoryview(b"ACGTTT"), Interval(2, 5, "g"))
+
+        assert path.read_bytes() == b">g\nGTT"
+
+    def test_fileExists_raisesErrorNamingInterval(self, tmp_path):
+        path = tmp_path / "g.fa"
+        path.write_bytes(b"old")
+
+        with pytest.raises(FileExistsError, match="g.fa"):
+            write_chunk(str(path), ">g", memoryview(b"ACGT"), Interval(0, 2, "g"))
+
+        assert path.read_bytes() == b"old"
+
+
+class TestInferIntervalType:
+    @pytest.mark.parametrize(
+        "data,expected",
+        [
+            ("IGR:1-5", "igr"),
+            ("dnaA", "feature"),
+            ("IGR:1-5+IGR:5-6", "merged_igrs"),
+            ("dnaA+IGR:5-6", "merged_feature_and_igr"),
+            ("dnaA+dnaN", "merged_features"),
+        ],
+    )
+    def test_type(self, data, expected):
+        assert infer_interval_type(Interval(0, 1, data)) == expected
+
+
+class TestMain:
+    @pytest.fixture
+    def inputs(self, tmp_path):
+        fasta = tmp_path / "g.fa"
+        gff = tmp_path / "g.gff"
+        fasta_lines = []
+        fai_lines = []
+        gff_lines = []
+        offset = 0
+        for i in range(6):
+            header = f">c{i} desc\n"
+            fasta_lines.append(f"{header}{'ACGT' * 5}\n{'TTGCA' * 4}\n")
+            # 40 bases over lines of 20, each 21 bytes wide with the newline
+            offset += len(header)
+            fai_lines.append(f"c{i}\t40\t{offset}\t20\t21\n")
+            offset += 42
+            gff_lines.append(
+                f"c{i}\tsrc\tgene\t{i + 3}\t{i + 10}\t.\t+\t.\tName=g{i}\n"
+            )
+            gff_lines.append(f"c{i}\tsrc\tgene\t25\t32\t.\t-\t.\tID=Rv{i}\n")
+        fasta.write_text("".join(fasta_lines))
+        (tmp_path / "g.fa.fai").write_text("".join(fai_lines))
+        gff.write_text("".join(gff_lines))
+        return str(fasta), str(gff)
+
+    def split(self, inputs, outdir, *args):
+        fasta, gff = inputs
+        runner = CliRunner()
+        return runner.invoke(main, ["-f", fasta, "-g", gff, "-o", str(outdir), *args])
+
+    def test_processesAndSequential_sameOutput(self, inputs, tmp_path):
+        sequential = self.split(inputs, tmp_path / "t1", "-t", "1")
+        parallel = self.split(inputs, tmp_path / "t2", "-t", "2")
+
+        assert sequential.exit_code == 0
+        assert parallel.exit_code == 0
+        actual = read_outdir(tmp_path / "t2")
+        expected = read_outdir(tmp_path / "t1")
+
+        assert actual == expected
+        assert len(actual) == 1 + 6 * 5
+
+    @pytest.mark.parametrize("threads", ["1", "3"])
+    def test_faidx_sameOutputAsInMemory(self, inputs, tmp_path, threads):
+        in_memory = self.split(inputs, tmp_path / "mem", "-t", threads)
+        from_faidx = self.split(inputs, tmp_path / "fai", "--faidx", "-t", threads)
+
+        assert in_memory.exit_code == 0
+        assert from_faidx.exit_code == 0
+        actual = read_outdir(tmp_path / "fai")
+        expected = read_outdir(tmp_path / "mem")
+
+        assert actual == expected
+
+    def test_rerunIntoSameOutdirWithProcesses_raisesError(self, inputs, tmp_path):
+        self.split(inputs, tmp_path / "out", "-t", "2")
+
+        result = self.split(inputs, tmp_path / "out", "-t", "2")
+
+        assert result.exit_code != 0
+        assert isinstance(result.exception, FileExistsError)